@@ -1,104 +1,497 @@
 import sys
 import os
 import argparse
-import re
 import binascii
-import struct
+import codecs
 import json
 import shutil
+import multiprocessing
+import threading
+from collections import OrderedDict
+
+try:
+    import queue
+except ImportError:
+    # Python 2.
+    import Queue as queue
+
 from . import db
 
 __author__ = 'Erik Moqvist'
 __version__ = '16.2.0'
 
 
-# Matches 'candump' output, i.e. "vcan0  1F0   [8]  00 00 00 00 00 00 1B C1".
-RE_CANDUMP = re.compile(r'^.*  ([0-9A-F]+)   \[\d+\]\s*([0-9A-F ]*)$')
+# Maximum number of characters read at a time from standard input by
+# the decode subcommand.
+READ_SIZE = 1 << 20
+
+# Number of lines in each chunk decoded by a worker process when the
+# decode subcommand runs in parallel.
+DECODE_CHUNK_SIZE = 4096
+
+# Frame encoder of decode worker processes.
+_decode_worker = {}
+
+_JSON_ENCODE = json.JSONEncoder(ensure_ascii=False).encode
 
-# (1378.006329)  can0   0B2   [8]  F9 0D 04 0E 0A 0E 11 0E
-RE_TIMESTAMP = re.compile(r'\s*\((.*)\)')
+_INF = float('inf')
 
-# signal database
-signal_db = {}
+# Default number of rows buffered per signal before they are written
+# to its CSV file by the decode subcommand.
+CSV_FLUSH_SIZE = 512
 
+# Default maximum number of rows buffered for all signals. All
+# buffers are written when exceeded.
+CSV_MAX_BUFFERED_ROWS = 1 << 20
 
-def _mo_unpack(mo):
-    frame_id = mo.group(1)
-    frame_id = '0' * (8 - len(frame_id)) + frame_id
-    frame_id = binascii.unhexlify(frame_id)
-    frame_id = struct.unpack('>I', frame_id)[0]
-    data = mo.group(2)
-    data = data.replace(' ', '')
-    data = binascii.unhexlify(data)
+# Default maximum number of simultaneously open CSV files.
+CSV_MAX_OPEN_FILES = 128
 
-    return frame_id, data
 
+def _read_available(fp):
+    """Returns a function reading at most `READ_SIZE` characters of
+    given file object. It returns as soon as any data is available
+    instead of waiting for `READ_SIZE` characters, so lines from a live
+    source, for example ``candump can0 | cantools decode ...``, are
+    decoded as they arrive.
+
+    """
 
-def _format_message_json(dbf, frame_id, data):
     try:
-        message = dbf.get_message_by_frame_id(frame_id)
-    except KeyError:
-        return 'Unknown frame id {}'.format(frame_id)
+        read1 = fp.buffer.read1
+    except AttributeError:
+        try:
+            fd = fp.fileno()
+        except (AttributeError, IOError, ValueError):
+            # Not backed by a file, for example StringIO.
+            return lambda: fp.read(READ_SIZE)
+
+        return lambda: os.read(fd, READ_SIZE)
+
+    decoder = codecs.getincrementaldecoder(fp.encoding or 'utf-8')(
+        fp.errors or 'strict')
+
+    def read():
+        while True:
+            data = read1(READ_SIZE)
+
+            if not data:
+                return decoder.decode(b'', True)
+
+            block = decoder.decode(data)
+
+            # Wait for the rest of an incomplete multi byte character.
+            if block:
+                return block
+
+    return read
+
+
+def _read_blocks(fp):
+    """Read given file object and yield a list of the complete lines
+    read by each read call, without the line separator.
+
+    """
+
+    read = _read_available(fp)
+    rest = ''
+
+    while True:
+        block = read()
+
+        if not block:
+            break
+
+        lines = (rest + block).split('\n')
+        rest = lines.pop()
+
+        if lines:
+            yield lines
+
+    if rest:
+        yield [rest]
+
+
+def _read_lines(fp):
+    """Read given file object and yield its lines without the line
+    separator.
+
+    """
+
+    for lines in _read_blocks(fp):
+        for line in lines:
+            yield line
+
+
+def _parse_candump_line(line):
+    """Parse given line of 'candump' output. Returns a tuple of the
+    timestamp in milliseconds, or 0 if unavailable, the frame id and
+    the frame data. The frame id and data are ``None`` if the line is
+    not a data frame.
+
+    All candump output formats are supported, with or without
+    timestamps:
+
+    .. code:: text
+
+       vcan0  1F0   [8]  00 00 00 00 00 00 1B C1
+       (1378.006329)  can0   0B2   [8]  F9 0D 04 0E 0A 0E 11 0E
+       (1436509052.249713) vcan0 044#2A366C2BBA
+       (1436509052.249713) vcan0 123##10011223344556677
+
+    """
+
+    timestamp = 0
+    start = line.find('(')
+
+    if start != -1 and not line[:start].strip():
+        end = line.rfind(')')
+
+        if end > start:
+            try:
+                timestamp = int(float(line[start + 1:end]) * 1000)
+            except ValueError:
+                pass
 
     try:
-        decoded_signals_raw = message.decode(data, decode_choices=False, scaling=False)
-        decoded_signals = message.decode(data, decode_choices=True, scaling=True)
-    except ValueError as e:
-        return str(e)
+        if '#' in line:
+            # Log format. CAN FD frames have two '#' followed by a
+            # flags digit.
+            for field in line.split():
+                if '#' in field:
+                    break
+
+            frame_id, _, data = field.partition('#')
+
+            if data[:1] == '#':
+                data = data[2:]
+        else:
+            # Frame id followed by the length in brackets and the data
+            # bytes.
+            start = line.find('[')
+            end = line.find(']', start)
+
+            if start == -1 or end == -1:
+                return timestamp, None, None
+
+            frame_id = line[:start].split()[-1]
+            data = line[end + 1:].replace(' ', '')
+
+        return timestamp, int(frame_id, 16), binascii.unhexlify(data)
+    except (IndexError, TypeError, ValueError):
+        return timestamp, None, None
+
+
+class _SignalWriter(object):
+    """Writes decoded signal values to one CSV file per signal, in a
+    directory per message in given output folder.
+
+    Rows are buffered per signal and written with one writelines()
+    call when `flush_size` rows are buffered. All buffers are written
+    if more than `max_buffered_rows` rows are buffered in total. At
+    most `max_open_files` files are kept open. The least recently
+    written file is closed when another one is needed.
+
+    """
+
+    def __init__(self,
+                 output_folder,
+                 flush_size=CSV_FLUSH_SIZE,
+                 max_buffered_rows=CSV_MAX_BUFFERED_ROWS,
+                 max_open_files=CSV_MAX_OPEN_FILES):
+        self._output_folder = output_folder
+        self._flush_size = flush_size
+        self._max_buffered_rows = max_buffered_rows
+        self._max_open_files = max_open_files
+        self._buffers = {}
+        self._number_of_buffered_rows = 0
+        self._files = OrderedDict()
+        self._created = set()
+
+    def write(self, timestamp, message_name, signals):
+        """Buffer given decoded signals of given message.
+
+        """
+
+        for name, raw_value, value in signals:
+            key = (message_name, name)
+
+            try:
+                rows = self._buffers[key]
+            except KeyError:
+                rows = []
+                self._buffers[key] = rows
+
+            rows.append((timestamp, raw_value, value))
+            self._number_of_buffered_rows += 1
+
+            if len(rows) >= self._flush_size:
+                self._flush_rows(key)
+
+        if self._number_of_buffered_rows > self._max_buffered_rows:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered rows to their files.
+
+        """
+
+        for key in list(self._buffers):
+            self._flush_rows(key)
+
+    def close(self):
+        """Write all buffered rows and close all files.
+
+        """
+
+        self.flush()
+
+        for fout in self._files.values():
+            fout.close()
+
+        self._files.clear()
+
+    def _flush_rows(self, key):
+        rows = self._buffers.pop(key)
+        self._number_of_buffered_rows -= len(rows)
+        self._open(key).writelines(['{};{};{}\n'.format(*row)
+                                    for row in rows])
+
+    def _open(self, key):
+        try:
+            fout = self._files.pop(key)
+        except KeyError:
+            fout = self._open_new(key)
+
+        # Most recently used last.
+        self._files[key] = fout
+
+        return fout
+
+    def _open_new(self, key):
+        if len(self._files) >= self._max_open_files:
+            self._files.popitem(last=False)[1].close()
+
+        message_name, name = key
+        message_dir = os.path.join(self._output_folder, message_name)
+        path = os.path.join(message_dir, name + '.csv')
+
+        if key in self._created:
+            return open(path, 'a')
+
+        if not os.path.exists(message_dir):
+            os.mkdir(message_dir)
+
+        fout = open(path, 'w')
+        fout.write('timestamp;raw_value;computed_value\n')
+        self._created.add(key)
+
+        return fout
+
 
-    formatted_signals = []
+def _read_chunks(fp, size):
+    """Yield lists of at most `size` lines read from given file
+    object. Lines are not held back waiting for a full chunk, so a
+    chunk may be smaller if fewer lines are available.
+
+    """
+
+    for lines in _read_blocks(fp):
+        for i in range(0, len(lines), size):
+            yield lines[i:i + size]
+
+
+def _dump_json_value(value):
+    """Return given signal value as JSON text, equal to
+    ``json.dumps(value, ensure_ascii=False)``.
+
+    """
+
+    value_type = type(value)
+
+    if value_type is int:
+        return str(value)
+    elif value_type is float and -_INF < value < _INF:
+        return repr(value)
+    else:
+        return _JSON_ENCODE(value)
+
+
+class _FrameEncoder(object):
+    """Decodes candump lines and serializes them to JSON text. The key
+    strings of each message and signal are formatted once and reused
+    for all frames of the message. The text equals
+    ``json.dumps(frame, ensure_ascii=False)`` of the frame
+    dictionaries printed by earlier versions.
+
+    """
+
+    def __init__(self, dbf, timestamp_only, silent_output, output_folder):
+        self._dbf = dbf
+        self._timestamp_only = timestamp_only
+        self._silent_output = silent_output
+        self._output_folder = output_folder
+        self._messages = {}
+
+    def _get_message(self, frame_id):
+        try:
+            return self._messages[frame_id]
+        except KeyError:
+            pass
+
+        message = self._dbf.get_message_by_frame_id(frame_id)
+        head = '{{"id": {}, "name": {}, "signals": ['.format(
+            frame_id,
+            _JSON_ENCODE(message.name))
+        signals = []
+
+        for signal in message.signals:
+            signal_head = '{{"name": {}, "raw_value": '.format(
+                _JSON_ENCODE(signal.name))
+
+            if signal.unit:
+                signal_tail = ', "unit": {}}}'.format(_JSON_ENCODE(signal.unit))
+            else:
+                signal_tail = '}'
+
+            signals.append((signal.name, signal_head, signal_tail))
+
+        self._messages[frame_id] = (message, head, signals)
+
+        return self._messages[frame_id]
+
+    def _encode_message(self, frame_id, data):
+        """Returns the JSON text of given frame and its message name and
+        signals, or ``None`` if it could not be decoded.
+
+        """
 
-    for signal in message.signals:
         try:
-            value_raw = decoded_signals_raw[signal.name]
-            value = decoded_signals[signal.name]
+            message, head, signals = self._get_message(frame_id)
         except KeyError:
-            continue
-
-        signal_dictionary = {
-            "name": signal.name,
-            "raw_value": value_raw,
-            "computed_value": value
-        }
-        if signal.unit:
-            signal_dictionary["unit"] = signal.unit
-
-        formatted_signals.append(signal_dictionary)
-
-    return {"id": frame_id, "name": message.name, "signals": formatted_signals}
-
-
-def _signal_to_file(output_folder, timestamp, message_name, signals):
-    # make message directories
-    message_dir = os.path.join(output_folder, message_name)
-    if not os.path.exists(message_dir):
-        os.mkdir(message_dir)
-
-    for signal in signals:
-        if signal['name'] not in signal_db:
-            signal_path = os.path.join(message_dir, signal['name'] + '.csv')
-            if not os.path.exists(signal_path):
-                with open(signal_path, "w") as sig_file:
-                    sig_file.write("timestamp;raw_value;computed_value\n")
-            signal_db[signal['name']] = {'message': message_name, 'values':[]}
-        
-        signal_db[signal['name']]['values'].append([timestamp, signal['raw_value'], signal['computed_value']])
-
-        if len(signal_db[signal['name']]['values']) >= 512:
-            signal_path = os.path.join(message_dir, signal['name'] + '.csv')
-            with open(signal_path, "a") as sig_file:
-                for sig in signal_db[signal['name']]['values']:
-                    sig_file.write("{};{};{}\n".format(sig[0], sig[1], sig[2]))
-            signal_db[signal['name']] = {'message': message_name, 'values':[]}
-
-
-def _signal_flush(output_folder):
-    for signal_name in signal_db:
-        message_dir = os.path.join(output_folder, signal_db[signal_name]['message'])
-        signal_path = os.path.join(message_dir, signal_name + '.csv')
-        with open(signal_path, "a") as sig_file:
-            for sig in signal_db[signal_name]['values']:
-                sig_file.write("{};{};{}\n".format(sig[0], sig[1], sig[2]))
+            return _JSON_ENCODE('Unknown frame id {}'.format(frame_id)), None
+
+        try:
+            decoded_signals = message.decode_with_raw(data)
+        except ValueError as e:
+            return _JSON_ENCODE(str(e)), None
+
+        texts = []
+        values = []
+
+        for name, signal_head, signal_tail in signals:
+            try:
+                raw_value, value = decoded_signals[name]
+            except KeyError:
+                continue
+
+            if not self._silent_output:
+                texts.append(signal_head
+                             + _dump_json_value(raw_value)
+                             + ', "computed_value": '
+                             + _dump_json_value(value)
+                             + signal_tail)
+
+            values.append((name, raw_value, value))
+
+        return head + ', '.join(texts) + ']}', (message.name, values)
+
+    def encode_lines(self, lines):
+        """Decode given candump lines. Returns a list of the JSON text of
+        each line, empty if output is silent, and a list of tuples of
+        the timestamp, message name and signals of each decoded
+        message, empty if there is no output folder.
+
+        """
+
+        texts = []
+        decoded = []
+
+        for line in lines:
+            line = line.strip('\r\n')
+            timestamp, frame_id, data = _parse_candump_line(line)
+
+            if frame_id is None:
+                message_text = 'null'
+                message = None
+                timestamp_text = _JSON_ENCODE(line)
+            else:
+                message_text, message = self._encode_message(frame_id, data)
+
+                if self._timestamp_only:
+                    timestamp_text = str(timestamp)
+                else:
+                    timestamp_text = _JSON_ENCODE(line)
+
+            if not self._silent_output:
+                texts.append('{"timestamp": '
+                             + timestamp_text
+                             + ', "message": '
+                             + message_text
+                             + '}')
+
+            if self._output_folder and message is not None:
+                decoded.append((timestamp, ) + message)
+
+        return texts, decoded
+
+
+def _init_decode_worker(dbf, timestamp_only, silent_output, output_folder):
+    _decode_worker['encoder'] = _FrameEncoder(dbf,
+                                              timestamp_only,
+                                              silent_output,
+                                              output_folder)
+
+
+def _decode_chunk_job(lines):
+    return _decode_worker['encoder'].encode_lines(lines)
+
+
+def _decode_chunks_parallel(chunks, jobs, initargs):
+    """Decode given chunks of lines in a pool of `jobs` processes and
+    yield the results in input order. At most two chunks per process
+    are in flight, so the input is not read faster than it is
+    decoded.
+
+    The chunks are read and submitted to the pool by a separate
+    thread, so each result is yielded as soon as it is ready, even if
+    the thread is waiting for more input.
+
+    """
+
+    pool = multiprocessing.Pool(jobs, _init_decode_worker, initargs)
+    pending = queue.Queue(2 * jobs)
+
+    def submit_chunks():
+        try:
+            for chunk in chunks:
+                pending.put(
+                    (pool.apply_async(_decode_chunk_job, (chunk, )), None))
+        except Exception as e:
+            pending.put((None, e))
+        else:
+            pending.put((None, None))
+
+    # A daemon thread, as it may be blocked reading input when the
+    # decoding is aborted.
+    thread = threading.Thread(target=submit_chunks)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        while True:
+            result, error = pending.get()
+
+            if error is not None:
+                raise error
+
+            if result is None:
+                break
+
+            yield result.get()
+    finally:
+        pool.terminate()
+        pool.join()
 
 
 def _do_decode(args):
@@ -113,63 +506,83 @@ def _do_decode(args):
         os.makedirs(output_folder)
     else:
         output_folder = None
-    
-    first = True
-    while True:
-        line = sys.stdin.readline()
 
-        # Break at EOF.
-        if not line:
-            if output_folder:
-                _signal_flush(output_folder)
-            break
+    if args.jobs > 1:
+        # The database is loaded once and given to the worker
+        # processes.
+        decoded_chunks = _decode_chunks_parallel(
+            _read_chunks(sys.stdin, DECODE_CHUNK_SIZE),
+            args.jobs,
+            (dbf, timestamp_only, silent_output, output_folder))
+    else:
+        # The lines of each read are decoded at once, without waiting
+        # for more lines.
+        encoder = _FrameEncoder(dbf,
+                                timestamp_only,
+                                silent_output,
+                                output_folder)
+        decoded_chunks = (encoder.encode_lines(lines)
+                          for lines in _read_blocks(sys.stdin))
+
+    # Each chunk is written at once. The JSON format is an array with
+    # one frame per line, and NDJSON is one frame per line.
+    if args.format == 'ndjson':
+        separator = '\n'
+        first_prefix = ''
+        prefix = ''
+    else:
+        separator = '\n,'
+        first_prefix = '['
+        prefix = ','
+
+    if output_folder:
+        signal_writer = _SignalWriter(output_folder,
+                                      args.csv_flush_size,
+                                      args.csv_max_buffered_rows,
+                                      args.csv_max_open_files)
+    else:
+        signal_writer = None
 
-        line = line.strip('\r\n')
-        frame_dictionary = {
-            "timestamp": line,
-            "message": None
-        }
-        mo = RE_CANDUMP.match(line)
-        ts = RE_TIMESTAMP.match(line)
+    write = sys.stdout.write
+    flush = sys.stdout.flush
+    first = True
 
-        if ts:
-            try:
-                timestamp = int(float(ts.group(1)) * 1000)
-            except ValueError:
-                timestamp = 0
-        else:
-            timestamp = 0
-
-        if mo:
-            frame_id, data = _mo_unpack(mo)
-            formatted_message = _format_message_json(
-                dbf,
-                frame_id,
-                data
-            )
-            
-            frame_dictionary = {
-                "timestamp": timestamp if timestamp_only else line,
-                "message": formatted_message
-            }
-
-        if not silent_output:
-            if first:
-                print("[{}".format(json.dumps(frame_dictionary, ensure_ascii=False)))
+    try:
+        for texts, decoded in decoded_chunks:
+            # Flushed so the output can be processed while the input
+            # is still being read.
+            if texts:
+                write((first_prefix if first else prefix)
+                      + separator.join(texts)
+                      + '\n')
+                flush()
                 first = False
-            else:
-                print(",{}".format(json.dumps(frame_dictionary, ensure_ascii=False)))
-        
-        if output_folder and "name" in frame_dictionary["message"]:
-            _signal_to_file(
-                output_folder,
-                timestamp,
-                frame_dictionary["message"]["name"],
-                frame_dictionary["message"]["signals"]
-            )
 
-    if not silent_output:
-        print(']')
+            for timestamp, message_name, signals in decoded:
+                signal_writer.write(timestamp, message_name, signals)
+    finally:
+        if signal_writer is not None:
+            signal_writer.close()
+
+    if not silent_output and args.format == 'json':
+        write(']\n')
+
+
+def _positive_integer(value):
+    """Argument type of options that must be a positive integer.
+
+    """
+
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            "invalid positive integer value: '{}'".format(value))
+
+    return number
 
 
 def _main():
@@ -201,6 +614,34 @@ def _main():
     decode_parser.add_argument('-o', '--output',
                                nargs='+',
                                help='Output folder for signal .csv files.')
+    decode_parser.add_argument('--csv-flush-size',
+                               type=_positive_integer,
+                               default=CSV_FLUSH_SIZE,
+                               help=('Number of rows buffered per signal before '
+                                     'writing them to its .csv file (default: '
+                                     '{}).'.format(CSV_FLUSH_SIZE)))
+    decode_parser.add_argument('--csv-max-buffered-rows',
+                               type=_positive_integer,
+                               default=CSV_MAX_BUFFERED_ROWS,
+                               help=('Maximum number of rows buffered for all '
+                                     'signals (default: {}).'.format(
+                                         CSV_MAX_BUFFERED_ROWS)))
+    decode_parser.add_argument('--csv-max-open-files',
+                               type=_positive_integer,
+                               default=CSV_MAX_OPEN_FILES,
+                               help=('Maximum number of open .csv files '
+                                     '(default: {}).'.format(
+                                         CSV_MAX_OPEN_FILES)))
+    decode_parser.add_argument('-j', '--jobs',
+                               type=_positive_integer,
+                               default=1,
+                               help=('Number of processes decoding frames '
+                                     '(default: 1).'))
+    decode_parser.add_argument('-f', '--format',
+                               choices=('json', 'ndjson'),
+                               default='json',
+                               help=('Output format, a JSON array or one JSON '
+                                     'object per line (default: json).'))
     decode_parser.add_argument('dbfile', help='Database file (.dbc).')
     decode_parser.set_defaults(func=_do_decode)
 
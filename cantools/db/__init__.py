@@ -1,3 +1,12 @@
+import io
+import os
+import re
+import sys
+import hashlib
+import logging
+import multiprocessing
+import pickle
+import tempfile
 from xml.etree import ElementTree
 
 from .formats.utils import ParseError
@@ -6,6 +15,39 @@ from .message import Message
 from .signal import Signal
 
 
+LOGGER = logging.getLogger(__name__)
+
+# Environment variable with the default cache directory of
+# load_file().
+CACHE_DIR_ENVIRONMENT_VARIABLE = 'CANTOOLS_CACHE_DIR'
+
+# Format guessing by the first non-blank characters of a database.
+_RE_FORMAT = re.compile(r'\s*(?:'
+                        r'(?P<kcd><)'
+                        r'|(?P<sym>FormatVersion\s*=)'
+                        r'|(?P<dbc>(?:VERSION|NS_|BS_|BU_|BO_|CM_)(?![A-Za-z0-9_]))'
+                        r')')
+
+# Function to add database data in a file-like object to a file and
+# the error it raises on invalid syntax, per format that is parsed
+# incrementally.
+_ADD_FP = {
+    'dbc': (File.add_dbc, ParseError),
+    'kcd': (File.add_kcd, ElementTree.ParseError)
+}
+
+# Number of characters read to guess the format of a database file.
+_SNIFF_SIZE = 1024
+
+# Function to add a database string to a file and the error it
+# raises on invalid syntax, per format.
+_ADD_STRING = {
+    'dbc': (File.add_dbc_string, ParseError),
+    'kcd': (File.add_kcd_string, ElementTree.ParseError),
+    'sym': (File.add_sym_string, ParseError)
+}
+
+
 class UnsupportedDatabaseFormatError(Exception):
     """This exception is raised when :func:`~cantools.db.load_file()`,
     :func:`~cantools.db.load()` and :func:`~cantools.db.load_string()`
@@ -33,8 +75,54 @@ class UnsupportedDatabaseFormatError(Exception):
         self.e_kcd = e_kcd
         self.e_sym = e_sym
 
+    def __reduce__(self):
+        return (self.__class__, (self.e_dbc, self.e_kcd, self.e_sym))
+
+
+def _cache_key(content, database_format):
+    from .. import __version__
+
+    key = hashlib.sha256()
+    key.update('{} {} {}.{}\n'.format(__version__,
+                                       database_format,
+                                       *sys.version_info[:2]).encode('ascii'))
+    key.update(content)
+
+    return key.hexdigest()
+
+
+def _load_cache(path):
+    try:
+        with open(path, 'rb') as fin:
+            return pickle.load(fin)
+    except (IOError, OSError):
+        return None
+    except Exception as e:
+        LOGGER.debug("Ignoring unreadable cache file '%s': %s.", path, e)
+
+        return None
+
+
+def _save_cache(path, db):
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+
+        try:
+            with os.fdopen(fd, 'wb') as fout:
+                pickle.dump(db, fout, pickle.HIGHEST_PROTOCOL)
+
+            os.rename(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+    except Exception as e:
+        LOGGER.debug("Unable to write cache file '%s': %s.", path, e)
 
-def load_file(filename, database_format=None):
+
+def load_file(filename, database_format=None, cache_dir=None, lazy=False):
     """Open, read and parse given database file and return a
     :class:`~cantools.db.File` object with its
     contents. `database_format` may be one of ``'dbc'``, ``'kcd'``,
@@ -43,14 +131,127 @@ def load_file(filename, database_format=None):
     :class:`~cantools.db.UnsupportedDatabaseFormatError` exception if
     given file does not contain a supported database format.
 
+    If `cache_dir`, or the environment variable
+    ``CANTOOLS_CACHE_DIR``, is set, the parsed database is stored in
+    that directory, keyed by the file contents and the cantools
+    version, and later calls load it from there instead of parsing
+    the file again. The cache files are pickles, so only use a
+    directory that is trusted.
+
+    If `lazy` is ``True``, DBC messages are parsed when first used
+    instead of when the file is loaded, which makes loading big files
+    much faster when only a few messages are used. See
+    :meth:`~cantools.db.File.add_dbc_string()` for details. The cache
+    is not used in this mode.
+
     >>> db = cantools.db.load_file('foo.dbc')
     >>> db.version
     '1.0'
 
     """
 
-    with open(filename, 'r') as fin:
-        return load(fin, database_format)
+    if lazy and database_format in ['dbc', None]:
+        with open(filename, 'r') as fin:
+            string = fin.read()
+
+        if _sniff_format(string) in ['dbc', None]:
+            try:
+                db = File()
+                db.add_dbc_string(string, lazy)
+                return db
+            except ParseError as e:
+                return _load_string(string, database_format, {'dbc': e})
+
+        return _load_string(string, database_format)
+
+    if cache_dir is None:
+        cache_dir = os.environ.get(CACHE_DIR_ENVIRONMENT_VARIABLE)
+
+    if cache_dir:
+        with open(filename, 'rb') as fin:
+            content = fin.read()
+
+        path = os.path.join(cache_dir,
+                            _cache_key(content, database_format) + '.pickle')
+        db = _load_cache(path)
+
+        if db is not None:
+            return db
+
+    if cache_dir:
+        # Parse the already read contents, decoded as open() in text
+        # mode would, instead of reading the file again.
+        db = load(io.TextIOWrapper(io.BytesIO(content)), database_format)
+        _save_cache(path, db)
+    else:
+        with open(filename, 'r') as fin:
+            db = load(fin, database_format)
+
+    return db
+
+
+def _load_file_job(args):
+    return load_file(*args)
+
+
+def load_files(filenames,
+               database_format=None,
+               cache_dir=None,
+               jobs=None,
+               merge=True):
+    """Open, read and parse given database files in parallel and return
+    a :class:`~cantools.db.File` object with the contents of all of
+    them. `database_format` and `cache_dir` are passed to
+    :func:`~cantools.db.load_file()`.
+
+    The files are parsed by a pool of `jobs` processes, or one per
+    CPU if `jobs` is ``None``. If `jobs` is 1 the files are parsed in
+    the calling process.
+
+    The parsed files are merged with
+    :meth:`~cantools.db.File.add_file()` in the order given in
+    `filenames`, no matter which file is parsed first. That is, if
+    several files contain a message with the same frame id or name,
+    the one in the last file is found by
+    :meth:`~cantools.db.File.get_message_by_frame_id()` and
+    :meth:`~cantools.db.File.get_message_by_name()`.
+
+    If `merge` is ``False``, a list of one
+    :class:`~cantools.db.File` object per file is returned instead,
+    in the same order as `filenames`.
+
+    >>> db = cantools.db.load_files(['powertrain.dbc', 'body.kcd'])
+
+    """
+
+    filenames = list(filenames)
+    args = [(filename, database_format, cache_dir) for filename in filenames]
+
+    if jobs is None:
+        jobs = multiprocessing.cpu_count()
+
+    jobs = min(jobs, len(filenames))
+
+    if jobs > 1:
+        pool = multiprocessing.Pool(jobs)
+
+        try:
+            databases = pool.map(_load_file_job, args)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        databases = [_load_file_job(arg) for arg in args]
+
+    if not merge:
+        return databases
+
+    db = File()
+
+    for database in databases:
+        db.add_file(database)
+
+    return db
 
 
 def load(fp, database_format=None):
@@ -70,6 +271,38 @@ def load(fp, database_format=None):
 
     """
 
+    try:
+        start = fp.tell()
+    except (AttributeError, IOError, OSError):
+        start = None
+
+    # DBC and KCD data is parsed incrementally, and the whole file is
+    # only read if that fails. Other formats, and files that cannot
+    # be rewound, are read all at once.
+    if start is not None:
+        if database_format is None:
+            streamed_format = _sniff_format(fp.read(_SNIFF_SIZE))
+            fp.seek(start)
+
+            if streamed_format is None:
+                streamed_format = 'dbc'
+        else:
+            streamed_format = database_format
+
+        if streamed_format in _ADD_FP:
+            add_fp, parse_error = _ADD_FP[streamed_format]
+
+            try:
+                db = File()
+                add_fp(db, fp)
+                return db
+            except parse_error as e:
+                fp.seek(start)
+
+                return _load_string(fp.read(),
+                                    database_format,
+                                    {streamed_format: e})
+
     return load_string(fp.read(), database_format)
 
 
@@ -93,32 +326,60 @@ def load_string(string, database_format=None):
             "expected database format 'dbc', 'kcd', 'sym' or None, but "
             "got '{}'".format(database_format))
 
-    e_dbc = None
-    e_kcd = None
-    e_sym = None
+    return _load_string(string, database_format)
 
-    if database_format in ['dbc', None]:
-        try:
-            db = File()
-            db.add_dbc_string(string)
-            return db
-        except ParseError as e:
-            e_dbc = e
 
-    if database_format in ['kcd', None]:
-        try:
-            db = File()
-            db.add_kcd_string(string)
-            return db
-        except ElementTree.ParseError as e:
-            e_kcd = e
+def _sniff_format(string):
+    """Guess the format of given database string from its first
+    non-blank characters. Returns ``'dbc'``, ``'kcd'``, ``'sym'`` or
+    ``None`` if unknown.
+
+    """
+
+    mo = _RE_FORMAT.match(string)
+
+    if mo is None:
+        return None
+
+    return mo.lastgroup
+
+
+def _load_string(string, database_format, errors=None):
+    """Parse given database string. Formats in the dictionary `errors`
+    are not tried, as parsing them has already failed with given
+    error.
+
+    If `database_format` is ``None`` the format guessed by
+    _sniff_format() is tried first, and then the other formats.
+
+    """
+
+    errors = dict(errors) if errors else {}
+
+    if database_format is None:
+        database_formats = ['dbc', 'kcd', 'sym']
+        sniffed_format = _sniff_format(string)
+
+        if sniffed_format is not None:
+            database_formats.remove(sniffed_format)
+            database_formats.insert(0, sniffed_format)
+    else:
+        database_formats = [database_format]
+
+    for database_format in database_formats:
+        if database_format in errors:
+            continue
+
+        add_string, parse_error = _ADD_STRING[database_format]
 
-    if database_format in ['sym', None]:
         try:
             db = File()
-            db.add_sym_string(string)
+            add_string(db, string)
             return db
-        except ParseError as e:
-            e_sym = e
+        except parse_error as e:
+            errors[database_format] = e
+
+    raise UnsupportedDatabaseFormatError(errors.get('dbc'),
+                                         errors.get('kcd'),
+                                         errors.get('sym'))
 
-    raise UnsupportedDatabaseFormatError(e_dbc, e_kcd, e_sym)
@@ -5,6 +5,8 @@ class Bus(object):
 
     """
 
+    __slots__ = ('_name', '_comment', '_baudrate')
+
     def __init__(self,
                  name,
                  comment=None,
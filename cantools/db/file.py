@@ -1,4 +1,6 @@
 import logging
+from bisect import bisect_right
+from collections import OrderedDict
 
 from .formats import dbc
 from .formats import kcd
@@ -31,6 +33,10 @@ class File(object):
         self._buses = buses if buses else []
         self._name_to_message = {}
         self._frame_id_to_message = {}
+        # Sorted, non-overlapping frame id ranges as (minimum, maximum,
+        # message) tuples, and the minimum of each range for bisect.
+        self._frame_id_ranges = []
+        self._frame_id_range_minimums = []
         self._version = version
         self._attribute_definitions = (attribute_definitions
                                        if attribute_definitions
@@ -38,6 +44,7 @@ class File(object):
         self._attribute_definition_defaults = (attribute_definition_defaults
                                                if attribute_definition_defaults
                                                else [])
+        self._lazy_messages = None
 
     @property
     def messages(self):
@@ -49,6 +56,9 @@ class File(object):
 
         """
 
+        if self._lazy_messages is not None:
+            self._load_lazy_messages()
+
         return self._messages
 
     @property
@@ -77,7 +87,8 @@ class File(object):
 
     def add_dbc(self, fp):
         """Read and parse DBC data from given file-like object and add the
-        parsed data to the database.
+        parsed data to the database. Seekable files are read in chunks
+        instead of all at once.
 
         >>> db = cantools.db.File()
         >>> with open ('foo.dbc', 'r') as fin:
@@ -85,11 +96,12 @@ class File(object):
 
         """
 
-        self.add_dbc_string(fp.read())
+        self._add_dbc_database(dbc.load(fp))
 
-    def add_dbc_file(self, filename):
+    def add_dbc_file(self, filename, lazy=False):
         """Open, read and parse DBC data from given file and add the parsed
-        data to the database.
+        data to the database. See :meth:`.add_dbc_string()` for a
+        description of `lazy`.
 
         >>> db = cantools.db.File()
         >>> db.add_dbc_file('foo.dbc', 'r')
@@ -97,20 +109,43 @@ class File(object):
         """
 
         with open(filename, 'r') as fin:
-            self.add_dbc(fin)
+            if lazy:
+                self.add_dbc_string(fin.read(), lazy)
+            else:
+                self.add_dbc(fin)
 
-    def add_dbc_string(self, string):
+    def add_dbc_string(self, string, lazy=False):
         """Parse given DBC data string and add the parsed data to the
         database.
 
+        If `lazy` is ``True``, messages are only indexed by frame id
+        and name, and each message is parsed when first used. That is,
+        by :meth:`.get_message_by_frame_id()`,
+        :meth:`.get_message_by_name()` and the encode and decode
+        methods. Accessing :attr:`.messages` parses all
+        messages. Syntax errors in messages are raised when they are
+        parsed.
+
         >>> db = cantools.db.File()
         >>> with open ('foo.dbc', 'r') as fin:
         ...     db.add_dbc_string(fin.read())
 
         """
 
-        database = dbc.load_string(string)
+        if lazy:
+            database = dbc.load_string_lazy(string)
+
+            if self._lazy_messages is not None:
+                self._load_lazy_messages()
 
+            self._lazy_messages = database.messages
+            database.messages = []
+        else:
+            database = dbc.load_string(string)
+
+        self._add_dbc_database(database)
+
+    def _add_dbc_database(self, database):
         for message in database.messages:
             self.add_message(message)
         self._nodes = database.nodes
@@ -121,11 +156,12 @@ class File(object):
 
     def add_kcd(self, fp):
         """Read and parse KCD data from given file-like object and add the
-        parsed data to the database.
+        parsed data to the database. The data is parsed incrementally,
+        so the whole XML document is never held in memory.
 
         """
 
-        self.add_kcd_string(fp.read())
+        self._add_kcd_database(kcd.load(fp))
 
     def add_kcd_file(self, filename):
         """Open, read and parse KCD data from given file and add the parsed
@@ -142,8 +178,9 @@ class File(object):
 
         """
 
-        database = kcd.load_string(string)
+        self._add_kcd_database(kcd.load_string(string))
 
+    def _add_kcd_database(self, database):
         for message in database.messages:
             self.add_message(message)
         self._nodes = database.nodes
@@ -185,6 +222,58 @@ class File(object):
         self._attribute_definitions = database.attribute_definitions
         self._attribute_definition_defaults = database.attribute_definition_defaults
 
+    def add_file(self, database):
+        """Add the messages, nodes, buses and attribute definitions of
+        given :class:`~cantools.db.File` object `database` to the
+        database.
+
+        Messages are added with :meth:`.add_message()`, so a message
+        with the same name or frame id as a message already in the
+        database replaces it in the lookup tables. Nodes, buses and
+        attribute definitions already in the database are kept. The
+        version is only set if the database has none.
+
+        >>> db = cantools.db.File()
+        >>> db.add_file(cantools.db.load_file('foo.dbc'))
+
+        """
+
+        for message in database.messages:
+            self.add_message(message)
+
+        node_names = set([node.name for node in self._nodes])
+
+        for node in database.nodes:
+            if node.name not in node_names:
+                self._nodes.append(node)
+                node_names.add(node.name)
+
+        bus_names = set([bus.name for bus in self._buses])
+
+        for bus in database.buses:
+            if bus.name not in bus_names:
+                self._buses.append(bus)
+                bus_names.add(bus.name)
+
+        if self._version is None:
+            self._version = database.version
+
+        attribute_names = set([attribute[2]
+                               for attribute in self._attribute_definitions])
+
+        for attribute in database._attribute_definitions:
+            if attribute[2] not in attribute_names:
+                self._attribute_definitions.append(attribute)
+                attribute_names.add(attribute[2])
+
+        if database._attribute_definition_defaults:
+            if not self._attribute_definition_defaults:
+                self._attribute_definition_defaults = OrderedDict()
+
+            for name, value in database._attribute_definition_defaults.items():
+                if name not in self._attribute_definition_defaults:
+                    self._attribute_definition_defaults[name] = value
+
     def add_message(self, message):
         """Add given message to the database.
 
@@ -205,12 +294,49 @@ class File(object):
         self._name_to_message[message.name] = message
         self._frame_id_to_message[message.frame_id] = message
 
+        if message.frame_id_range is not None:
+            minimum, maximum = message.frame_id_range
+            self._add_frame_id_range(minimum, maximum, message)
+
+    def _add_frame_id_range(self, minimum, maximum, message):
+        """Add given frame id range to the sorted range index. Parts of
+        existing ranges overlapped by the new range are replaced, so
+        the last added range wins.
+
+        """
+
+        ranges = self._frame_id_ranges
+        minimums = self._frame_id_range_minimums
+
+        # The overlapped ranges are ranges[begin:end].
+        begin = bisect_right(minimums, minimum) - 1
+
+        if begin < 0 or ranges[begin][1] < minimum:
+            begin += 1
+
+        end = bisect_right(minimums, maximum)
+        replacement = [(minimum, maximum, message)]
+
+        if begin < end:
+            first = ranges[begin]
+
+            if first[0] < minimum:
+                replacement.insert(0, (first[0], minimum - 1, first[2]))
+
+            last = ranges[end - 1]
+
+            if last[1] > maximum:
+                replacement.append((maximum + 1, last[1], last[2]))
+
+        ranges[begin:end] = replacement
+        minimums[begin:end] = [item[0] for item in replacement]
+
     def as_dbc_string(self):
         """Return the database as a string formatted as a DBC file.
 
         """
 
-        return dbc.dump_string(Database(self._messages,
+        return dbc.dump_string(Database(self.messages,
                                         self._nodes,
                                         self._buses,
                                         self._version,
@@ -222,26 +348,91 @@ class File(object):
 
         """
 
-        return kcd.dump_string(Database(self._messages,
+        return kcd.dump_string(Database(self.messages,
                                         self._nodes,
                                         self._buses,
                                         self._version,
                                         self._attribute_definitions,
                                         self._attribute_definition_defaults))
 
+    def _load_lazy_messages(self):
+        """Parse all lazily loaded messages and add them, and any
+        messages added after them, to the database in the same order
+        as a non-lazy load.
+
+        """
+
+        messages = self._lazy_messages.get_messages() + self._messages
+        self._lazy_messages = None
+        self._messages = []
+        self._name_to_message = {}
+        self._frame_id_to_message = {}
+        self._frame_id_ranges = []
+        self._frame_id_range_minimums = []
+
+        for message in messages:
+            self.add_message(message)
+
     def get_message_by_name(self, name):
         """Find the message object for given name `name`.
 
         """
 
-        return self._name_to_message[name]
+        try:
+            return self._name_to_message[name]
+        except KeyError:
+            if self._lazy_messages is None:
+                raise
+
+        message = self._lazy_messages.get_message_by_name(name)
+        self._name_to_message[name] = message
+
+        return message
 
     def get_message_by_frame_id(self, frame_id):
         """Find the message object for given frame id `frame_id`.
 
+        Messages sent with a range of frame ids, see
+        :attr:`~cantools.db.Message.frame_id_range`, are found by any
+        frame id in the range, unless another message has that exact
+        frame id. The last added range wins if ranges overlap.
+
         """
 
-        return self._frame_id_to_message[frame_id]
+        try:
+            return self._frame_id_to_message[frame_id]
+        except KeyError:
+            if self._lazy_messages is None and not self._frame_id_ranges:
+                raise
+
+        if self._lazy_messages is not None:
+            try:
+                message = self._lazy_messages.get_message_by_frame_id(frame_id)
+            except KeyError:
+                if not self._frame_id_ranges:
+                    raise
+            else:
+                self._frame_id_to_message[frame_id] = message
+
+                return message
+
+        return self._get_message_by_frame_id_range(frame_id)
+
+    def _get_message_by_frame_id_range(self, frame_id):
+        try:
+            index = bisect_right(self._frame_id_range_minimums, frame_id) - 1
+
+            if index >= 0:
+                _, maximum, message = self._frame_id_ranges[index]
+
+                if frame_id <= maximum:
+                    return message
+        except TypeError:
+            # Not an integer, for example a message name given to
+            # encode_message().
+            pass
+
+        raise KeyError(frame_id)
 
     def get_node_by_name(self, name):
         """Find the node object for given name `name`.
@@ -265,6 +456,25 @@ class File(object):
 
         raise KeyError(name)
 
+    def warm_up(self, frame_ids=None):
+        """Create the encoding and decoding tables of messages with given
+        frame ids, or all messages if `frame_ids` is ``None``. The
+        tables are otherwise created when a message is first encoded
+        or decoded.
+
+        >>> db.warm_up([158, 159])
+
+        """
+
+        if frame_ids is None:
+            messages = self.messages
+        else:
+            messages = [self.get_message_by_frame_id(frame_id)
+                        for frame_id in frame_ids]
+
+        for message in messages:
+            message._warm_up()
+
     def encode_message(self,
                        frame_id_or_name,
                        data,
@@ -286,9 +496,9 @@ class File(object):
         """
 
         try:
-            message = self._frame_id_to_message[frame_id_or_name]
+            message = self.get_message_by_frame_id(frame_id_or_name)
         except KeyError:
-            message = self._name_to_message[frame_id_or_name]
+            message = self.get_message_by_name(frame_id_or_name)
 
         return message.encode(data, scaling, padding)
 
@@ -296,7 +506,8 @@ class File(object):
                        frame_id_or_name,
                        data,
                        decode_choices=True,
-                       scaling=True):
+                       scaling=True,
+                       signals=None):
         """Decode given signal data `data` as a message of given frame id or
         name `frame_id_or_name`. Returns a dictionary of signal
         name-value entries.
@@ -306,6 +517,10 @@ class File(object):
 
         If `scaling` is ``False`` no scaling of signals is performed.
 
+        If `signals` is given, only signals with names in it are
+        decoded, along with the multiplexer signals needed to select
+        them.
+
         >>> db.decode_message(158, b'\\x01\\x45\\x23\\x00\\x11')
         {'Bar': 1, 'Fum': 5.0}
         >>> db.decode_message('Foo', b'\\x01\\x45\\x23\\x00\\x11')
@@ -314,11 +529,39 @@ class File(object):
         """
 
         try:
-            message = self._frame_id_to_message[frame_id_or_name]
+            message = self.get_message_by_frame_id(frame_id_or_name)
         except KeyError:
-            message = self._name_to_message[frame_id_or_name]
+            message = self.get_message_by_name(frame_id_or_name)
+
+        return message.decode(data, decode_choices, scaling, signals)
+
+    def decode_messages(self, frames, decode_choices=True, scaling=True):
+        """Decode given iterable of ``(frame_id, data)`` pairs. Returns a
+        list of dictionaries of signal name-value entries, one per
+        frame.
+
+        See :meth:`.decode_message()` for a description of
+        `decode_choices` and `scaling`.
+
+        >>> db.decode_messages([(158, b'\\x01\\x45\\x23\\x00\\x11'),
+        ...                     (158, b'\\x01\\x45\\x23\\x00\\x12')])
+        [{'Bar': 1, 'Fum': 5.0}, {'Bar': 1, 'Fum': 5.1}]
+
+        """
+
+        decoders = {}
+        decoded = []
+
+        for frame_id, data in frames:
+            try:
+                decode = decoders[frame_id]
+            except KeyError:
+                decode = self.get_message_by_frame_id(frame_id).decode
+                decoders[frame_id] = decode
+
+            decoded.append(decode(data, decode_choices, scaling))
 
-        return message.decode(data, decode_choices, scaling)
+        return decoded
 
     def __repr__(self):
         lines = []
@@ -332,7 +575,7 @@ class File(object):
 
             lines.append('')
 
-        for message in self._messages:
+        for message in self.messages:
             lines.append(repr(message))
 
             for signal in message.signals:
@@ -1,6 +1,9 @@
 # Load and dump a CAN database in DBC format.
 
+import re
+import threading
 from collections import OrderedDict
+from collections import defaultdict
 from pyparsing import Word
 from pyparsing import Literal
 from pyparsing import Keyword
@@ -21,6 +24,7 @@ from pyparsing import ParseException
 from pyparsing import ParseSyntaxException
 
 from ..signal import Signal
+from ..signal import _intern
 from ..message import Message
 from ..node import Node
 from ..database import Database
@@ -98,6 +102,12 @@ BU_: {bu}
 {val}
 """
 
+_GRAMMAR = None
+_GRAMMAR_LOCK = threading.Lock()
+
+# Number of characters read at a time by load().
+_CHUNK_SIZE = 65536
+
 
 def _create_grammar():
     """Create the DBC grammar.
@@ -337,6 +347,600 @@ def _create_grammar():
     return OneOrMore(entry) + StringEnd()
 
 
+def _get_grammar():
+    """Get the DBC grammar, which is created on first use and then
+    shared by all threads.
+
+    """
+
+    global _GRAMMAR
+
+    with _GRAMMAR_LOCK:
+        if _GRAMMAR is None:
+            grammar = _create_grammar()
+
+            # Streamline once here, as parseString() would otherwise
+            # modify the grammar on first use.
+            grammar.streamline()
+            _GRAMMAR = grammar
+
+    return _GRAMMAR
+
+
+# Regular expressions used by the hand-written parser. Each one skips
+# leading whitespace the same way as the corresponding pyparsing
+# element in the grammar above.
+_WS = r'[ \t\n\r]*'
+_RE_WHITESPACE = re.compile(_WS)
+_RE_KEYWORD = re.compile(_WS + r'(?<![A-Za-z0-9_$])([A-Za-z0-9_$]+)')
+_RE_WORD = re.compile(_WS + r'([!-9<-~]+)')
+_RE_NUMBER = re.compile(_WS + r'([0-9.Ee+\-]+)')
+_RE_POSITIVE_INTEGER = re.compile(_WS + r'([0-9]+)')
+_RE_STRING = re.compile(_WS + r'"([^"]*)"')
+_RE_NODE = re.compile(r' *([A-Za-z0-9_\-]+)')
+_RE_DELIMITED_NODE = re.compile(_WS + r', *([A-Za-z0-9_\-]+)')
+_RE_SYMBOL = re.compile(_WS + r'([A-Za-z_]+)[ \t\r]*(?:\n|\Z)')
+_RE_CHOICE = re.compile(_WS + r'(-)?' + _WS + r'([0-9]+)' + _WS + r'"([^"]*)"')
+_RE_ENUM_VALUE = re.compile(_WS + r'(?:,' + _WS + r')?"([^"]*)"')
+_RE_RANGE = re.compile(_WS + r'([0-9]+)' + _WS + r'-' + _WS + r'[0-9]+')
+_RE_DELIMITED_RANGE = re.compile(_WS + r',' + _RE_RANGE.pattern)
+_RE_SIGN = re.compile(_WS + r'([+\-])')
+_RE_COLON = re.compile(_WS + r':')
+_RE_SCOLON = re.compile(_WS + r';')
+_RE_PIPE = re.compile(_WS + r'\|')
+_RE_AT = re.compile(_WS + r'@')
+_RE_COMMA = re.compile(_WS + r',')
+_RE_LP = re.compile(_WS + r'\(')
+_RE_RP = re.compile(_WS + r'\)')
+_RE_LB = re.compile(_WS + r'\[')
+_RE_RB = re.compile(_WS + r'\]')
+
+# A line starting with an entry keyword followed by more text. It
+# cannot be a continuation of the previous entry, not even a symbol in
+# NS_, and is where load() splits the file.
+_RE_ENTRY_START = re.compile(
+    r'(?:' + '|'.join([
+        VERSION,
+        'NS_',
+        'BS_',
+        NODES,
+        MESSAGE,
+        COMMENT,
+        ATTRIBUTE_DEFINITION,
+        ATTRIBUTE_DEFINITION_DEFAULT,
+        ATTRIBUTE,
+        CHOICE,
+        VALUE_TABLE,
+        SIGNAL_TYPE,
+        SIGNAL_MULTIPLEXER_VALUES,
+        MESSAGE_TX_NODE,
+        ATTRIBUTE_DEFINITION_REL,
+        ATTRIBUTE_DEFINITION_DEFAULT_REL,
+        ATTRIBUTE_REL,
+        EVENT
+    ]) + r')(?![A-Za-z0-9_$])[ \t\r]*[^ \t\r\n]')
+_RE_ENTRY_LINE = re.compile(r'^(?=' + _RE_ENTRY_START.pattern + ')([A-Z_]+)',
+                            re.MULTILINE)
+
+# Well formed entries that load_string_lazy() defers until their
+# message is used. The last matched group is the frame id. Entries
+# not matching these are parsed when the file is loaded.
+_LAZY_WORD = r'[!#-9<-~]+'
+_LAZY_END = r'[ \t]*;[ \t\r\n]*\Z'
+_RE_LAZY_ENTRIES = {
+    MESSAGE: re.compile(
+        r'BO_[ \t]+([0-9]+)[ \t]+(' + _LAZY_WORD + r')[^\n"]*'
+        r'(?:\n[ \t\r]*(?:SG_[ \t][^\n"]*"[^\n"]*"[^\n"]*)?)*'
+        r'[ \t\r\n]*\Z'),
+    COMMENT: re.compile(
+        r'CM_[ \t]+(?:BO_[ \t]+([0-9]+)[ \t]*'
+        r'|SG_[ \t]+([0-9]+)[ \t]+' + _LAZY_WORD + r'[ \t]+)'
+        r'"[^"]*"' + _LAZY_END),
+    ATTRIBUTE: re.compile(
+        r'BA_[ \t]+"[^"]*"[ \t]+(?:BO_[ \t]+([0-9]+)'
+        r'|SG_[ \t]+([0-9]+)[ \t]+' + _LAZY_WORD + r')'
+        r'[ \t]+(?:"[^"]*"|[0-9.Ee+\-]+)' + _LAZY_END),
+    CHOICE: re.compile(
+        r'VAL_[ \t]+([0-9]+)[ \t]+' + _LAZY_WORD
+        + r'(?:[ \t]+-?[0-9]+[ \t]+"[^"]*")+' + _LAZY_END),
+    SIGNAL_TYPE: re.compile(
+        r'SIG_VALTYPE_[ \t]+([0-9]+)[ \t]+' + _LAZY_WORD
+        + r'[ \t]*:[ \t]*[0-9]+' + _LAZY_END),
+    MESSAGE_TX_NODE: re.compile(
+        r'BO_TX_BU_[ \t]+([0-9]+)[ \t]*:[ \t]*[A-Za-z0-9_\-]+'
+        r'(?:[ \t]*,[ \t]*[A-Za-z0-9_\-]+)*' + _LAZY_END),
+    SIGNAL_MULTIPLEXER_VALUES: re.compile(
+        r'SG_MUL_VAL_[ \t]+([0-9]+)[ \t]+' + _LAZY_WORD
+        + r'[ \t]+' + _LAZY_WORD
+        + r'[ \t]+[0-9]+[ \t]*-[ \t]*[0-9]+'
+        r'(?:[ \t]*,[ \t]*[0-9]+[ \t]*-[ \t]*[0-9]+)*' + _LAZY_END)
+}
+
+
+class _SyntaxError(Exception):
+    pass
+
+
+class _Parser(object):
+    """A hand-written recursive descent DBC parser. Creates the same
+    tokens as the pyparsing grammar from :func:`_create_grammar()`,
+    but many times faster.
+
+    Raises :class:`_SyntaxError` without any details on invalid
+    input. The caller then parses the string once more using the
+    grammar to create a descriptive error message.
+
+    """
+
+    def __init__(self, string):
+        # pyparsing expands tabs before parsing, which is visible in
+        # quoted strings.
+        self._string = string.expandtabs()
+        self._pos = 0
+        self._keyword = None
+        self._entries = {
+            VERSION: self._parse_version,
+            'NS_': self._parse_symbols,
+            'BS_': self._parse_discard,
+            NODES: self._parse_nodes,
+            MESSAGE: self._parse_message,
+            COMMENT: self._parse_comment,
+            ATTRIBUTE_DEFINITION: self._parse_attribute_definition,
+            ATTRIBUTE_DEFINITION_DEFAULT: self._parse_attribute_definition_default,
+            ATTRIBUTE: self._parse_attribute,
+            CHOICE: self._parse_choice,
+            VALUE_TABLE: self._parse_value_table,
+            SIGNAL_TYPE: self._parse_signal_type,
+            SIGNAL_MULTIPLEXER_VALUES: self._parse_signal_multiplexer_values,
+            MESSAGE_TX_NODE: self._parse_message_add_sender,
+            ATTRIBUTE_DEFINITION_REL: self._parse_attribute_definition_rel,
+            ATTRIBUTE_DEFINITION_DEFAULT_REL: self._parse_attribute_definition_default,
+            ATTRIBUTE_REL: self._parse_attribute_rel,
+            EVENT: self._parse_event
+        }
+
+    def _try_match(self, regex):
+        mo = regex.match(self._string, self._pos)
+
+        if mo is None:
+            return None
+
+        self._pos = mo.end()
+
+        return mo
+
+    def _match(self, regex):
+        mo = self._try_match(regex)
+
+        if mo is None:
+            raise _SyntaxError()
+
+        return mo
+
+    def _expect(self, regex):
+        return self._match(regex).group(1)
+
+    def _try_keyword(self, keywords):
+        mo = _RE_KEYWORD.match(self._string, self._pos)
+
+        if mo is None or mo.group(1) not in keywords:
+            return None
+
+        self._pos = mo.end()
+
+        return mo.group(1)
+
+    def _try_quoted_string(self):
+        mo = self._try_match(_RE_STRING)
+
+        if mo is None:
+            return None
+
+        return _unescape_whitespace(mo.group(1))
+
+    def _quoted_string(self):
+        return _unescape_whitespace(self._expect(_RE_STRING))
+
+    def _frame_id(self):
+        return int(self._expect(_RE_POSITIVE_INTEGER))
+
+    def _nodes(self):
+        nodes = [self._expect(_RE_NODE)]
+
+        while True:
+            mo = self._try_match(_RE_DELIMITED_NODE)
+
+            if mo is None:
+                return nodes
+
+            nodes.append(mo.group(1))
+
+    def _choices(self):
+        choices = []
+
+        while True:
+            mo = self._try_match(_RE_CHOICE)
+
+            if mo is None:
+                break
+
+            minus, value, text = mo.groups()
+
+            if minus is None:
+                value = [value]
+            else:
+                value = [minus, value]
+
+            choices.append([value, _unescape_whitespace(text)])
+
+        if not choices:
+            raise _SyntaxError()
+
+        return choices
+
+    def _attribute_definition_values(self, token):
+        token.append(self._expect(_RE_WORD))
+
+        if self._try_match(_RE_SCOLON):
+            return token
+
+        pos = self._pos
+        values = []
+
+        while True:
+            mo = self._try_match(_RE_ENUM_VALUE)
+
+            if mo is None:
+                break
+
+            values.append([_unescape_whitespace(mo.group(1))])
+
+        if self._try_match(_RE_SCOLON) is None:
+            self._pos = pos
+            values = []
+
+            while True:
+                mo = self._try_match(_RE_NUMBER)
+
+                if mo is None:
+                    break
+
+                values.append(mo.group(1))
+
+            self._match(_RE_SCOLON)
+
+        token.append(values)
+
+        return token
+
+    def _number_or_quoted_string(self):
+        mo = self._try_match(_RE_NUMBER)
+
+        if mo is not None:
+            return mo.group(1)
+
+        return self._quoted_string()
+
+    def _parse_version(self):
+        return [VERSION, self._quoted_string()]
+
+    def _parse_symbols(self):
+        self._match(_RE_COLON)
+        symbols = []
+
+        while True:
+            mo = self._try_match(_RE_SYMBOL)
+
+            if mo is None:
+                return ['NS_', symbols]
+
+            symbols.append(mo.group(1))
+
+    def _parse_discard(self):
+        self._match(_RE_COLON)
+
+    def _parse_nodes(self):
+        self._match(_RE_COLON)
+        nodes = []
+
+        while True:
+            mo = self._try_match(_RE_NODE)
+
+            if mo is None:
+                return [NODES, nodes]
+
+            nodes.append(mo.group(1))
+
+    def _parse_signal(self):
+        names = [self._expect(_RE_WORD)]
+        mo = self._try_match(_RE_WORD)
+
+        if mo is not None:
+            names.append(mo.group(1))
+
+        self._match(_RE_COLON)
+        start = self._expect(_RE_POSITIVE_INTEGER)
+        self._match(_RE_PIPE)
+        length = self._expect(_RE_POSITIVE_INTEGER)
+        self._match(_RE_AT)
+        byte_order = self._expect(_RE_POSITIVE_INTEGER)
+        sign = self._expect(_RE_SIGN)
+        self._match(_RE_LP)
+        scale = self._expect(_RE_NUMBER)
+        self._match(_RE_COMMA)
+        offset = self._expect(_RE_NUMBER)
+        self._match(_RE_RP)
+        self._match(_RE_LB)
+        minimum = self._expect(_RE_NUMBER)
+        self._match(_RE_PIPE)
+        maximum = self._expect(_RE_NUMBER)
+        self._match(_RE_RB)
+
+        return [SIGNAL,
+                names,
+                [start, length, byte_order, sign],
+                [scale, offset],
+                [minimum, maximum],
+                self._quoted_string(),
+                self._nodes()]
+
+    def _parse_message(self):
+        frame_id = self._frame_id()
+        name = self._expect(_RE_WORD)
+        self._match(_RE_COLON)
+        length = self._expect(_RE_POSITIVE_INTEGER)
+        sender = self._expect(_RE_WORD)
+        signals = []
+
+        while self._try_keyword((SIGNAL, )):
+            signals.append(self._parse_signal())
+
+        return [MESSAGE, frame_id, name, length, sender, signals]
+
+    def _parse_event(self):
+        self._match(_RE_WORD)
+        self._match(_RE_COLON)
+        self._match(_RE_POSITIVE_INTEGER)
+        self._match(_RE_LB)
+        self._match(_RE_NUMBER)
+        self._match(_RE_PIPE)
+        self._match(_RE_NUMBER)
+        self._match(_RE_RB)
+        self._match(_RE_STRING)
+        self._match(_RE_NUMBER)
+        self._match(_RE_NUMBER)
+        self._match(_RE_WORD)
+        self._match(_RE_NODE)
+        self._match(_RE_SCOLON)
+
+    def _parse_comment(self):
+        kind = self._try_keyword((MESSAGE, SIGNAL, NODES, EVENT))
+
+        if kind == MESSAGE:
+            token = [COMMENT, kind, self._frame_id()]
+        elif kind == SIGNAL:
+            token = [COMMENT, kind, self._frame_id(), self._expect(_RE_WORD)]
+        elif kind is not None:
+            token = [COMMENT, kind, self._expect(_RE_WORD)]
+        else:
+            token = [COMMENT]
+
+        token.append(self._quoted_string())
+        self._match(_RE_SCOLON)
+
+        return token
+
+    def _parse_attribute_definition(self):
+        token = [ATTRIBUTE_DEFINITION]
+        name = self._try_quoted_string()
+
+        if name is None:
+            kind = self._try_keyword((SIGNAL, MESSAGE, EVENT, NODES))
+
+            if kind is None:
+                raise _SyntaxError()
+
+            token.append(kind)
+            name = self._quoted_string()
+
+        token.append(name)
+
+        return self._attribute_definition_values(token)
+
+    def _parse_attribute_definition_default(self):
+        token = [self._keyword,
+                 self._quoted_string(),
+                 self._number_or_quoted_string()]
+        self._match(_RE_SCOLON)
+
+        return token
+
+    def _parse_attribute(self):
+        name = self._quoted_string()
+        kind = self._try_keyword((MESSAGE, SIGNAL, NODES))
+
+        if kind == MESSAGE:
+            owner = [kind, self._frame_id()]
+        elif kind == SIGNAL:
+            owner = [kind, self._frame_id(), self._expect(_RE_WORD)]
+        elif kind == NODES:
+            owner = [kind, self._expect(_RE_WORD)]
+        else:
+            owner = []
+
+        mo = self._try_match(_RE_STRING)
+
+        if mo is not None:
+            value = _unescape_whitespace(mo.group(1))
+        else:
+            value = self._expect(_RE_NUMBER)
+
+        self._match(_RE_SCOLON)
+
+        return [ATTRIBUTE, name, owner, value]
+
+    def _parse_choice(self):
+        mo = self._try_match(_RE_POSITIVE_INTEGER)
+
+        if mo is None:
+            frame_id = []
+        else:
+            frame_id = [int(mo.group(1))]
+
+        token = [CHOICE, frame_id, self._expect(_RE_WORD), self._choices()]
+        self._match(_RE_SCOLON)
+
+        return token
+
+    def _parse_value_table(self):
+        token = [VALUE_TABLE, self._expect(_RE_WORD), self._choices()]
+        self._match(_RE_SCOLON)
+
+        return token
+
+    def _parse_signal_type(self):
+        frame_id = self._frame_id()
+        name = self._expect(_RE_WORD)
+        self._match(_RE_COLON)
+        token = [SIGNAL_TYPE,
+                 frame_id,
+                 name,
+                 self._expect(_RE_POSITIVE_INTEGER)]
+        self._match(_RE_SCOLON)
+
+        return token
+
+    def _parse_signal_multiplexer_values(self):
+        frame_id = self._frame_id()
+        name = self._expect(_RE_WORD)
+        multiplexer_signal = self._expect(_RE_WORD)
+        ranges = [self._expect(_RE_RANGE)]
+
+        while True:
+            mo = self._try_match(_RE_DELIMITED_RANGE)
+
+            if mo is None:
+                break
+
+            ranges.append(mo.group(1))
+
+        self._match(_RE_SCOLON)
+
+        return [SIGNAL_MULTIPLEXER_VALUES,
+                frame_id,
+                name,
+                multiplexer_signal,
+                ranges]
+
+    def _parse_message_add_sender(self):
+        frame_id = self._frame_id()
+        self._match(_RE_COLON)
+        token = [MESSAGE_TX_NODE, frame_id, self._nodes()]
+        self._match(_RE_SCOLON)
+
+        return token
+
+    def _parse_attribute_definition_rel(self):
+        token = [ATTRIBUTE_DEFINITION_REL]
+        name = self._try_quoted_string()
+
+        if name is None:
+            if self._try_keyword((NODES_REL, )) is None:
+                raise _SyntaxError()
+
+            token.append(NODES_REL)
+            name = self._quoted_string()
+
+        token.append(name)
+
+        return self._attribute_definition_values(token)
+
+    def _parse_attribute_rel(self):
+        name = self._quoted_string()
+
+        if self._try_keyword((NODES_REL, )) is None:
+            raise _SyntaxError()
+
+        node = self._expect(_RE_WORD)
+
+        if self._try_keyword((SIGNAL, )) is None:
+            raise _SyntaxError()
+
+        token = [ATTRIBUTE_REL,
+                 name,
+                 NODES_REL,
+                 node,
+                 SIGNAL,
+                 self._frame_id(),
+                 self._expect(_RE_WORD),
+                 self._expect(_RE_POSITIVE_INTEGER)]
+        self._match(_RE_SCOLON)
+
+        return token
+
+    def parse(self):
+        """Parse the string and return a list of tokens.
+
+        """
+
+        tokens = []
+
+        while True:
+            mo = _RE_KEYWORD.match(self._string, self._pos)
+
+            if mo is None:
+                break
+
+            try:
+                parse_entry = self._entries[mo.group(1)]
+            except KeyError:
+                raise _SyntaxError()
+
+            self._keyword = mo.group(1)
+            self._pos = mo.end()
+            token = parse_entry()
+
+            if token is not None:
+                tokens.append(token)
+
+        # At least one entry and nothing but whitespace after the last
+        # one.
+        if self._pos == 0:
+            raise _SyntaxError()
+
+        if _RE_WHITESPACE.match(self._string, self._pos).end() != len(self._string):
+            raise _SyntaxError()
+
+        return tokens
+
+    def is_truncated(self):
+        """Returns True if the last syntax error may be caused by the
+        string ending in the middle of an entry, that is, if only
+        whitespace or an unterminated quoted string follows the error
+        position.
+
+        """
+
+        rest = self._string[self._pos:]
+
+        return rest.strip() == '' or rest.count('"') == 1
+
+
+def _unescape_whitespace(string):
+    """Replace escaped whitespace the same way as pyparsing's
+    QuotedString.
+
+    """
+
+    if '\\' in string:
+        string = string.replace(r'\t', '\t')
+        string = string.replace(r'\n', '\n')
+        string = string.replace(r'\f', '\f')
+        string = string.replace(r'\r', '\r')
+
+    return string
+
+
 def _dump_nodes(database):
     bu = []
 
@@ -493,9 +1097,6 @@ def _load_comments(tokens):
     comments = {}
 
     for comment in tokens:
-        if comment[0] != COMMENT:
-            continue
-
         if comment[1] == NODES:
             node_name = comment[2]
             comments[node_name] = comment[3]
@@ -524,8 +1125,7 @@ def _load_attribute_definitions(tokens):
     definitions = []
 
     for attribute in tokens:
-        if attribute[0] == ATTRIBUTE_DEFINITION:
-            definitions.append(attribute)
+        definitions.append(attribute)
 
     return definitions
 
@@ -534,8 +1134,7 @@ def _load_attribute_definition_defaults(tokens):
     defaults = OrderedDict()
 
     for default_attr in tokens:
-        if default_attr[0] == ATTRIBUTE_DEFINITION_DEFAULT:
-            defaults[default_attr[1]] = default_attr[2]
+        defaults[default_attr[1]] = default_attr[2]
 
     return defaults
 
@@ -544,9 +1143,6 @@ def _load_attributes(tokens):
     attributes = {}
 
     for attribute in tokens:
-        if attribute[0] != ATTRIBUTE:
-            continue
-
         name = attribute[1]
 
         if len(attribute[2]) == 2:
@@ -564,10 +1160,11 @@ def _load_attributes(tokens):
 def _load_choices(tokens):
     choices = {}
 
-    for choice in tokens:
-        if choice[0] != CHOICE:
-            continue
+    # Signals with equal choices share the same choice strings. Each
+    # signal has its own dictionary, as the choices may be modified.
+    tables = {}
 
+    for choice in tokens:
         if not choice[1]:
             continue
 
@@ -576,8 +1173,10 @@ def _load_choices(tokens):
         if frame_id not in choices:
             choices[frame_id] = {}
 
-        choices[frame_id][choice[2]] = OrderedDict(
-            (int(''.join(v[0])), v[1]) for v in choice[3])
+        items = tuple((int(''.join(v[0])), v[1]) for v in choice[3])
+
+        items = tables.setdefault(items, items)
+        choices[frame_id][choice[2]] = OrderedDict(items)
 
     return choices
 
@@ -590,9 +1189,6 @@ def _load_message_senders(tokens):
     message_senders = {}
 
     for senders in tokens:
-        if senders[0] != MESSAGE_TX_NODE:
-            continue
-
         frame_id = senders[1]
 
         if frame_id not in message_senders:
@@ -611,9 +1207,6 @@ def _load_signal_types(tokens):
     signal_types = {}
 
     for signal_type in tokens:
-        if signal_type[0] != SIGNAL_TYPE:
-            continue
-
         frame_id = signal_type[1]
 
         if frame_id not in signal_types:
@@ -633,9 +1226,6 @@ def _load_signal_multiplexer_values(tokens):
     signal_multiplexer_values = {}
 
     for signal_multiplexer_value in tokens:
-        if signal_multiplexer_value[0] != SIGNAL_MULTIPLEXER_VALUES:
-            continue
-
         frame_id = signal_multiplexer_value[1]
         signal_name = signal_multiplexer_value[2]
         multiplexer_signal = signal_multiplexer_value[3]
@@ -740,9 +1330,12 @@ def _load_messages(tokens,
 
     messages = []
 
-    for message in tokens:
-        if message[0] != MESSAGE:
-            continue
+    # Release the tokens of each message once it has been loaded, as
+    # they are bigger than the loaded message.
+    tokens.reverse()
+
+    while tokens:
+        message = tokens.pop()
 
         # Frame id.
         frame_id_dbc = message[1]
@@ -750,7 +1343,7 @@ def _load_messages(tokens,
         is_extended_frame = bool(frame_id_dbc & 0x80000000)
 
         # Nodes (or better, senders).
-        nodes = [message[4]]
+        nodes = [_intern(message[4])]
 
         for node in message_senders.get(frame_id_dbc, []):
             if node not in nodes:
@@ -776,7 +1369,7 @@ def _load_messages(tokens,
             signals=[Signal(name=signal[1][0],
                             start=int(signal[2][0]),
                             length=int(signal[2][1]),
-                            nodes=list(signal[6]),
+                            nodes=[_intern(node) for node in signal[6]],
                             byte_order=('big_endian'
                                         if signal[2][2] == '0'
                                         else 'little_endian'),
@@ -811,9 +1404,7 @@ def _load_messages(tokens,
 
 
 def _load_version(tokens):
-    return [token[1]
-            for token in tokens
-            if token[0] == VERSION][0]
+    return tokens[0][1]
 
 
 def _load_nodes(tokens, comments):
@@ -830,10 +1421,9 @@ def _load_nodes(tokens, comments):
     nodes = None
 
     for token in tokens:
-        if token[0] == NODES:
-            nodes = [Node(name=node,
-                          comment=get_node_comment(node))
-                     for node in token[1]]
+        nodes = [Node(name=node,
+                      comment=get_node_comment(node))
+                 for node in token[1]]
 
     return nodes
 
@@ -861,15 +1451,22 @@ def dump_string(database):
                           val='\n'.join(val))
 
 
-def load_string(string):
-    """Parse given string.
+def _parse_string(string):
+    """Parse given string into a list of tokens using the hand-written
+    parser. The pyparsing grammar is only used if the hand-written
+    parser fails, to create a descriptive error message.
 
     """
 
-    grammar = _create_grammar()
+    try:
+        return _Parser(string).parse()
+    except _SyntaxError:
+        pass
+
+    grammar = _get_grammar()
 
     try:
-        tokens = grammar.parseString(string)
+        return grammar.parseString(string)
     except (ParseException, ParseSyntaxException) as e:
         raise ParseError(
             "Invalid DBC syntax at line {}, column {}: '{}': {}.".format(
@@ -878,15 +1475,350 @@ def load_string(string):
                 e.markInputline(),
                 e.msg))
 
-    comments = _load_comments(tokens)
-    attribute_definitions = _load_attribute_definitions(tokens)
-    attribute_definition_defaults = _load_attribute_definition_defaults(tokens)
-    message_attributes = _load_attributes(tokens)
-    choices = _load_choices(tokens)
-    message_senders = _load_message_senders(tokens)
-    signal_types = _load_signal_types(tokens)
-    signal_multiplexer_values = _load_signal_multiplexer_values(tokens)
-    messages = _load_messages(tokens,
+
+def _find_entry_start(string):
+    """Returns the index of the last line in given string that starts a
+    new entry, or -1 if there is no such line.
+
+    """
+
+    end = len(string)
+
+    while True:
+        end = string.rfind('\n', 0, end)
+
+        if end == -1:
+            return -1
+
+        if _RE_ENTRY_START.match(string, end + 1):
+            return end + 1
+
+
+def _parse_file(fp):
+    """Parse given file-like object chunk by chunk, without reading the
+    whole file into memory. After each chunk, all entries before the
+    last line starting a new entry are parsed and their tokens
+    yielded. Raises :class:`_SyntaxError` on syntax errors.
+
+    """
+
+    buffer = ''
+
+    while True:
+        chunk = fp.read(_CHUNK_SIZE)
+        buffer += chunk
+
+        if chunk:
+            end = _find_entry_start(buffer)
+
+            if end == -1:
+                continue
+        else:
+            end = len(buffer)
+
+        parser = _Parser(buffer[:end])
+
+        try:
+            tokens = parser.parse()
+        except _SyntaxError:
+            # Read more data if the error may be caused by a quoted
+            # string containing a line that looks like an entry.
+            if chunk and parser.is_truncated():
+                continue
+
+            raise
+
+        for token in tokens:
+            yield token
+
+        if not chunk:
+            return
+
+        buffer = buffer[end:]
+
+
+def _token_frame_id(token):
+    """Returns the frame id of given message related token, or None if
+    the token is not related to a single message.
+
+    """
+
+    kind = token[0]
+
+    if kind == COMMENT:
+        if token[1] in [MESSAGE, SIGNAL]:
+            return token[2]
+    elif kind == ATTRIBUTE:
+        if len(token[2]) >= 2 and token[2][0] in [MESSAGE, SIGNAL]:
+            return token[2][1]
+    elif kind == CHOICE:
+        if token[1]:
+            return token[1][0]
+    elif kind in [MESSAGE_TX_NODE, SIGNAL_TYPE, SIGNAL_MULTIPLEXER_VALUES]:
+        return token[1]
+
+    return None
+
+
+class LazyMessages(object):
+    """Messages of a DBC file, each parsed when first used. Created by
+    :func:`load_string_lazy()`.
+
+    `messages` is a list of ``(frame_id_dbc, name, entry)`` in file
+    order and `related` a dictionary of frame id to a list of entries
+    of the message's comments, attributes, choices, etc. An entry is
+    either a token or a ``(start, end)`` slice of `string` that is
+    parsed on demand.
+
+    """
+
+    def __init__(self,
+                 string,
+                 messages,
+                 related,
+                 attribute_definition_defaults):
+        self._string = string
+        self._messages = messages
+        self._related = related
+        self._attribute_definition_defaults = attribute_definition_defaults
+        self._loaded = [None] * len(messages)
+        self._frame_id_to_index = {}
+        self._name_to_index = {}
+
+        for index, (frame_id_dbc, name, _) in enumerate(messages):
+            self._frame_id_to_index[frame_id_dbc & 0x7fffffff] = index
+            self._name_to_index[name] = index
+
+    def _parse(self, entry):
+        if isinstance(entry, list):
+            return [entry]
+
+        string = self._string[entry[0]:entry[1]]
+
+        try:
+            return _Parser(string).parse()
+        except _SyntaxError:
+            # Parse the whole file for an error message with the
+            # correct line number.
+            _parse_string(self._string)
+
+            return list(_parse_string(string))
+
+    def _load(self, index):
+        message = self._loaded[index]
+
+        if message is None:
+            frame_id_dbc, _, entry = self._messages[index]
+            tokens = self._parse(entry)
+
+            for entry in self._related.get(frame_id_dbc, []):
+                tokens += self._parse(entry)
+
+            sections = _split_sections(tokens)
+            message = _load_messages(
+                sections[MESSAGE],
+                _load_comments(sections[COMMENT]),
+                self._attribute_definition_defaults,
+                _load_attributes(sections[ATTRIBUTE]),
+                _load_choices(sections[CHOICE]),
+                _load_message_senders(sections[MESSAGE_TX_NODE]),
+                _load_signal_types(sections[SIGNAL_TYPE]),
+                _load_signal_multiplexer_values(
+                    sections[SIGNAL_MULTIPLEXER_VALUES]))[0]
+            self._loaded[index] = message
+
+        return message
+
+    def get_message_by_frame_id(self, frame_id):
+        """Parse and return the message with given frame id. Raises
+        ``KeyError`` if there is no such message.
+
+        """
+
+        return self._load(self._frame_id_to_index[frame_id])
+
+    def get_message_by_name(self, name):
+        """Parse and return the message with given name. Raises
+        ``KeyError`` if there is no such message.
+
+        """
+
+        return self._load(self._name_to_index[name])
+
+    def get_messages(self):
+        """Parse and return all messages, in file order.
+
+        """
+
+        return [self._load(index) for index in range(len(self._messages))]
+
+
+def _split_sections(tokens):
+    """Split given tokens into lists of tokens per section type in a
+    single pass, keeping the order within each section.
+
+    """
+
+    sections = defaultdict(list)
+
+    for token in tokens:
+        sections[token[0]].append(token)
+
+    return sections
+
+
+def load_string(string):
+    """Parse given string.
+
+    """
+
+    return _load_sections(_split_sections(_parse_string(string)))
+
+
+def load_string_lazy(string):
+    """Parse given string, except for messages and their comments,
+    attributes, choices, etc., which are only indexed by frame id and
+    name. The messages attribute of the returned database is a
+    :class:`LazyMessages` object that parses them when first used.
+
+    """
+
+    if _RE_WHITESPACE.match(string).end() == len(string):
+        _parse_string(string)
+
+    # Entries not inside multi line quoted strings.
+    entries = []
+    quotes = 0
+    previous = 0
+
+    for mo in _RE_ENTRY_LINE.finditer(string):
+        start = mo.start()
+        quotes += string.count('"', previous, start)
+        previous = start
+
+        if quotes % 2 == 0:
+            entries.append((mo.group(1), start))
+
+    entries.append((None, len(string)))
+
+    # Defer well formed message related entries and parse everything
+    # else.
+    messages = []
+    related = defaultdict(list)
+    tokens = []
+    parsed_start = 0
+
+    def parse(start, end):
+        part = string[start:end]
+
+        # Skip whitespace between deferred entries, as parsing it
+        # would fail.
+        if part.strip():
+            _index_tokens(_Parser(part).parse(), messages, related, tokens)
+
+    try:
+        for i in range(len(entries) - 1):
+            keyword, start = entries[i]
+            end = entries[i + 1][1]
+
+            try:
+                mo = _RE_LAZY_ENTRIES[keyword].match(string, start, end)
+            except KeyError:
+                continue
+
+            if mo is None:
+                continue
+
+            parse(parsed_start, start)
+
+            if keyword == MESSAGE:
+                messages.append((int(mo.group(1)), mo.group(2), (start, end)))
+            else:
+                related[int(mo.group(mo.lastindex))].append((start, end))
+
+            parsed_start = end
+
+        parse(parsed_start, len(string))
+    except _SyntaxError:
+        # Parse the whole file, which either raises an error with
+        # correct line number or creates tokens to index.
+        messages = []
+        related = defaultdict(list)
+        tokens = []
+        _index_tokens(_parse_string(string), messages, related, tokens)
+
+    sections = _split_sections(tokens)
+    comments = _load_comments(sections[COMMENT])
+    attribute_definition_defaults = _load_attribute_definition_defaults(
+        sections[ATTRIBUTE_DEFINITION_DEFAULT])
+
+    return Database(LazyMessages(string,
+                                 messages,
+                                 related,
+                                 attribute_definition_defaults),
+                    _load_nodes(sections[NODES], comments),
+                    [],
+                    _load_version(sections[VERSION]),
+                    _load_attribute_definitions(sections[ATTRIBUTE_DEFINITION]),
+                    attribute_definition_defaults)
+
+
+def _index_tokens(tokens, messages, related, other):
+    """Add messages and message related tokens to given index, and all
+    other tokens to `other`.
+
+    """
+
+    for token in tokens:
+        if token[0] == MESSAGE:
+            messages.append((token[1], token[2], token))
+        else:
+            frame_id = _token_frame_id(token)
+
+            if frame_id is None:
+                other.append(token)
+            else:
+                related[frame_id].append(token)
+
+
+def load(fp):
+    """Read and parse given DBC file-like object. The file is read and
+    parsed in chunks, unless it is not seekable.
+
+    """
+
+    try:
+        start = fp.tell()
+    except (AttributeError, IOError, OSError):
+        return load_string(fp.read())
+
+    try:
+        sections = _split_sections(_parse_file(fp))
+    except _SyntaxError:
+        # Parse the whole file once more for an error message.
+        fp.seek(start)
+        sections = _split_sections(_parse_string(fp.read()))
+
+    return _load_sections(sections)
+
+
+def _load_sections(sections):
+    """Create a database from given tokens split into sections.
+
+    """
+
+    comments = _load_comments(sections[COMMENT])
+    attribute_definitions = _load_attribute_definitions(
+        sections[ATTRIBUTE_DEFINITION])
+    attribute_definition_defaults = _load_attribute_definition_defaults(
+        sections[ATTRIBUTE_DEFINITION_DEFAULT])
+    message_attributes = _load_attributes(sections[ATTRIBUTE])
+    choices = _load_choices(sections[CHOICE])
+    message_senders = _load_message_senders(sections[MESSAGE_TX_NODE])
+    signal_types = _load_signal_types(sections[SIGNAL_TYPE])
+    signal_multiplexer_values = _load_signal_multiplexer_values(
+        sections[SIGNAL_MULTIPLEXER_VALUES])
+    messages = _load_messages(sections[MESSAGE],
                               comments,
                               attribute_definition_defaults,
                               message_attributes,
@@ -894,8 +1826,8 @@ def load_string(string):
                               message_senders,
                               signal_types,
                               signal_multiplexer_values)
-    nodes = _load_nodes(tokens, comments)
-    version = _load_version(tokens)
+    nodes = _load_nodes(sections[NODES], comments)
+    version = _load_version(sections[VERSION])
 
     return Database(messages,
                     nodes,
@@ -18,6 +18,12 @@ LOGGER = logging.getLogger(__name__)
 NAMESPACE = 'http://kayak.2codeornot2code.org/1.0'
 NAMESPACES = {'ns': NAMESPACE}
 
+# Qualified tags of elements loaded by load().
+BUS_TAG = '{{{}}}Bus'.format(NAMESPACE)
+DOCUMENT_TAG = '{{{}}}Document'.format(NAMESPACE)
+MESSAGE_TAG = '{{{}}}Message'.format(NAMESPACE)
+NODE_TAG = '{{{}}}Node'.format(NAMESPACE)
+
 
 def _load_signal_element(signal):
     """Load given signal element and return a signal object.
@@ -166,6 +172,53 @@ def dump_string(database):
     raise NotImplementedError('The KCD dump function is not yet implemented.')
 
 
+def load(fp):
+    """Parse KCD data from given file-like object.
+
+    The XML document is parsed incrementally and each message is
+    loaded as soon as its element has been read, after which the
+    element is discarded. That is, the whole document tree is never
+    held in memory.
+
+    """
+
+    nodes = []
+    buses = []
+    messages = []
+    version = None
+    has_document = False
+    elements = []
+
+    for event, element in ElementTree.iterparse(fp, events=('start', 'end')):
+        if event == 'start':
+            elements.append(element)
+
+            if len(elements) == 2 and element.tag == BUS_TAG:
+                bus_name = element.attrib['name']
+                bus_baudrate = int(element.get('baudrate', 500000))
+                buses.append(Bus(bus_name, baudrate=bus_baudrate))
+
+            continue
+
+        elements.pop()
+        depth = len(elements)
+
+        if depth == 2:
+            if element.tag == MESSAGE_TAG and elements[1].tag == BUS_TAG:
+                messages.append(_load_message_element(element, bus_name))
+                elements[1].remove(element)
+        elif depth == 1:
+            if element.tag == NODE_TAG:
+                nodes.append(Node(name=element.attrib['name'], comment=None))
+            elif element.tag == DOCUMENT_TAG and not has_document:
+                version = element.attrib.get('version', None)
+                has_document = True
+
+            elements[0].remove(element)
+
+    return Database(messages, nodes, buses, version)
+
+
 def load_string(string):
     """Parse given KCD format string.
 
@@ -1,6 +1,7 @@
 # Load and dump a CAN database in SYM format.
 
 import logging
+import threading
 from collections import OrderedDict
 from pyparsing import Word
 from pyparsing import Literal
@@ -30,6 +31,9 @@ from .utils import ParseError
 
 LOGGER = logging.getLogger(__name__)
 
+_GRAMMAR = None
+_GRAMMAR_LOCK = threading.Lock()
+
 
 def _create_grammar_6_0():
     """Create the SYM 6.0 grammar.
@@ -147,6 +151,26 @@ def _create_grammar_6_0():
     return grammar
 
 
+def _get_grammar_6_0():
+    """Get the SYM 6.0 grammar, which is created on first use and then
+    shared by all threads.
+
+    """
+
+    global _GRAMMAR
+
+    with _GRAMMAR_LOCK:
+        if _GRAMMAR is None:
+            grammar = _create_grammar_6_0()
+
+            # Streamline once here, as parseString() would otherwise
+            # modify the grammar on first use.
+            grammar.streamline()
+            _GRAMMAR = grammar
+
+    return _GRAMMAR
+
+
 def _get_section_tokens(tokens, name):
     for section in tokens[2]:
         if section[0] == name:
@@ -285,7 +309,7 @@ def _load_message_signals_inner(message_tokens,
 
 
 def _load_muxed_message_signals(message_tokens,
-                                message_section_tokens,
+                                variants_tokens,
                                 signals):
     mux_tokens = message_tokens[3]
     multiplexer_signal = mux_tokens[1]
@@ -297,19 +321,31 @@ def _load_muxed_message_signals(message_tokens,
                is_multiplexer=True)
     ]
 
-    multiplexer_ids = [int(mux_tokens[4])]
-    result += _load_message_signals_inner(message_tokens,
-                                          signals,
-                                          multiplexer_signal,
-                                          multiplexer_ids)
+    # A signal at the same position in several variants is loaded
+    # once, with the multiplexer ids of all of them.
+    multiplexer_ids_by_signal = {}
+    loaded = set()
+
+    for tokens in [message_tokens] + variants_tokens:
+        multiplexer_id = int(tokens[3][4])
 
-    for tokens in message_section_tokens:
-        if tokens[0] == message_tokens[0] and tokens != message_tokens:
-            multiplexer_ids = [int(tokens[3][4])]
-            result += _load_message_signals_inner(tokens,
-                                                  signals,
-                                                  multiplexer_signal,
-                                                  multiplexer_ids)
+        for signal_tokens in tokens[7]:
+            key = (signal_tokens[1], int(signal_tokens[2]))
+
+            if (key, multiplexer_id) in loaded:
+                continue
+
+            loaded.add((key, multiplexer_id))
+
+            try:
+                multiplexer_ids_by_signal[key].append(multiplexer_id)
+            except KeyError:
+                multiplexer_ids = [multiplexer_id]
+                multiplexer_ids_by_signal[key] = multiplexer_ids
+                result.append(_load_message_signal(signal_tokens,
+                                                   signals,
+                                                   multiplexer_signal,
+                                                   multiplexer_ids))
 
     return result
 
@@ -319,11 +355,11 @@ def _is_multiplexed(message_tokens):
 
 
 def _load_message_signals(message_tokens,
-                          message_section_tokens,
+                          variants_tokens,
                           signals):
     if _is_multiplexed(message_tokens):
         return _load_muxed_message_signals(message_tokens,
-                                           message_section_tokens,
+                                           variants_tokens,
                                            signals)
     else:
         return _load_message_signals_inner(message_tokens,
@@ -331,9 +367,10 @@ def _load_message_signals(message_tokens,
 
 
 def _load_message(frame_id,
+                  frame_id_range,
                   is_extended_frame,
                   message_tokens,
-                  message_section_tokens,
+                  variants_tokens,
                   signals):
     # Default values.
     name = message_tokens[0]
@@ -354,10 +391,11 @@ def _load_message(frame_id,
                    send_type=None,
                    cycle_time=cycle_time,
                    signals=_load_message_signals(message_tokens,
-                                                 message_section_tokens,
+                                                 variants_tokens,
                                                  signals),
                    comment=None,
-                   bus_name=None)
+                   bus_name=None,
+                   frame_id_range=frame_id_range)
 
 
 def _parse_message_frame_ids(message):
@@ -369,12 +407,12 @@ def _parse_message_frame_ids(message):
 
     if '-' in message[1][1]:
         minimum, maximum = message[1][1].split('-')
+        frame_id_range = (to_int(minimum), to_int(maximum))
     else:
-        minimum = maximum = message[1][1]
+        minimum = message[1][1]
+        frame_id_range = None
 
-    frame_ids = range(to_int(minimum), to_int(maximum) + 1)
-
-    return frame_ids, is_extended_frame(minimum)
+    return to_int(minimum), frame_id_range, is_extended_frame(minimum)
 
 
 def _load_message_section(section_name, tokens, signals):
@@ -384,19 +422,35 @@ def _load_message_section(section_name, tokens, signals):
     message_section_tokens = _get_section_tokens(tokens, section_name)
     messages = []
 
+    # Multiplexed symbols are split into one entry per multiplexer
+    # value, all with the same name.
+    tokens_by_name = {}
+
+    for message_tokens in message_section_tokens:
+        tokens_by_name.setdefault(message_tokens[0], []).append(message_tokens)
+
     for message_tokens in message_section_tokens:
         if not has_frame_id(message_tokens):
             continue
 
-        frame_ids, is_extended_frame = _parse_message_frame_ids(message_tokens)
-
-        for frame_id in frame_ids:
-            message = _load_message(frame_id,
-                                    is_extended_frame,
-                                    message_tokens,
-                                    message_section_tokens,
-                                    signals)
-            messages.append(message)
+        if _is_multiplexed(message_tokens):
+            variants_tokens = [
+                tokens
+                for tokens in tokens_by_name[message_tokens[0]]
+                if tokens is not message_tokens
+            ]
+        else:
+            variants_tokens = []
+
+        (frame_id,
+         frame_id_range,
+         is_extended_frame) = _parse_message_frame_ids(message_tokens)
+        messages.append(_load_message(frame_id,
+                                      frame_id_range,
+                                      is_extended_frame,
+                                      message_tokens,
+                                      variants_tokens,
+                                      signals))
 
     return messages
 
@@ -421,7 +475,7 @@ def load_string(string):
     if not string.startswith('FormatVersion=6.0'):
         raise ParseError('Only SYM version 6.0 is supported.')
 
-    grammar = _create_grammar_6_0()
+    grammar = _get_grammar_6_0()
 
     try:
         tokens = grammar.parseString(string)
@@ -1,9 +1,42 @@
 # A CAN message.
 
 import binascii
+import itertools
+import math
+import struct
 from collections import namedtuple
 from decimal import Decimal
-import bitstruct
+
+from .signal import _intern
+
+
+# Packed integer and float struct formats of float signals, by length.
+FLOAT_FORMATS = {
+    32: ('>I', '>f'),
+    64: ('>Q', '>d')
+}
+
+# Relative error bound used when deciding if a scaled float value is
+# too close to a rounding tie to be trusted.
+SCALING_EPSILON = 2.0 ** -50
+
+Formats = namedtuple('Formats',
+                     ['big_endian', 'little_endian', 'padding_mask'])
+
+
+if hasattr(int, 'to_bytes'):
+    def _pack_data(value, length):
+        return value.to_bytes(length, 'big')
+
+    def _swap_bytes(value, length):
+        return int.from_bytes(value.to_bytes(length, 'little'), 'big')
+else:
+    def _pack_data(value, length):
+        return binascii.unhexlify('{:0{}x}'.format(value, 2 * length))
+
+    def _swap_bytes(value, length):
+        return int(b'0' + binascii.hexlify(_pack_data(value, length)[::-1]),
+                   16)
 
 
 def _start_bit(signal):
@@ -13,9 +46,39 @@ def _start_bit(signal):
         return signal.start
 
 
-def _encode_signal(signal, data, scaling):
-    value = data[signal.name]
+def _scale_to_integer(value, offset, scale):
+    """Returns ``(value - offset) / scale`` rounded to the nearest integer,
+    ties to even. Plain integer or float arithmetic is used unless its
+    result is too close to a tie to be trusted, in which case the
+    exact decimal calculation decides.
+
+    """
+
+    if (isinstance(value, int)
+        and isinstance(offset, int)
+        and isinstance(scale, int)):
+        value -= offset
+
+        if value % scale == 0:
+            return value // scale
+
+        value += offset
+    else:
+        scaled = (value - offset) / float(scale)
 
+        if abs(scaled) < 2 ** 52:
+            error = ((abs(value) + abs(offset)) / abs(scale) + abs(scaled))
+            error *= SCALING_EPSILON
+
+            if abs(scaled - math.floor(scaled) - 0.5) > error:
+                return int(math.floor(scaled + 0.5))
+
+    value = (Decimal(value) - Decimal(offset)) / Decimal(scale)
+
+    return int(value.to_integral())
+
+
+def _encode_signal(signal, value, scaling):
     if isinstance(value, str):
         value = signal.choice_string_to_number(value)
 
@@ -23,70 +86,243 @@ def _encode_signal(signal, data, scaling):
         if signal.is_float:
             return (value - signal.offset) / signal.scale
         else:
-            value = (Decimal(value) - Decimal(signal.offset)) / Decimal(signal.scale)
-
-            return value.to_integral()
+            return _scale_to_integer(value, signal.offset, signal.scale)
     else:
         return value
 
 
-def _decode_signal(signal, value, decode_choices, scaling):
-    if scaling:
-        value = (signal.scale * value + signal.offset)
+def _out_of_range_error(signal, value):
+    if signal.is_signed:
+        type_ = 's'
+        minimum = -(1 << (signal.length - 1))
+        maximum = ((1 << (signal.length - 1)) - 1)
+    else:
+        type_ = 'u'
+        minimum = 0
+        maximum = ((1 << signal.length) - 1)
 
-    if decode_choices:
-        try:
-            decoded_signal = signal.choices[value]
-        except (KeyError, TypeError):
-            decoded_signal = value
+    return ValueError('"{}{}" requires {} <= integer <= {} (got {})'.format(
+        type_,
+        signal.length,
+        minimum,
+        maximum,
+        value))
+
+
+def _encode_signals(data, items, scaling):
+    encoded = 0
+
+    for signal, name, shift, mask, sign_bit, float_format in items:
+        value = _encode_signal(signal, data[name], scaling)
+
+        if float_format is not None:
+            value = struct.unpack(float_format[0],
+                                  struct.pack(float_format[1], value))[0]
+        else:
+            value = int(value)
+
+            if sign_bit:
+                if not -sign_bit <= value < sign_bit:
+                    raise _out_of_range_error(signal, value)
+            elif value < 0 or (value >> signal.length):
+                raise _out_of_range_error(signal, value)
+
+            value &= mask
+
+        encoded |= (value << shift)
+
+    return encoded
+
+
+def _encode_data(data, formats, length, scaling):
+    encoded = 0
+
+    if formats.big_endian:
+        encoded = _encode_signals(data, formats.big_endian, scaling)
+
+    if formats.little_endian:
+        encoded |= _swap_bytes(
+            _encode_signals(data, formats.little_endian, scaling),
+            length)
+
+    return encoded
+
+
+def _decode_signals(value, items, decode_choices, scaling, decoded):
+    for signal, name, shift, mask, sign_bit, float_format in items:
+        raw = ((value >> shift) & mask)
+
+        if float_format is not None:
+            raw = struct.unpack(float_format[1],
+                                struct.pack(float_format[0], raw))[0]
+        elif raw & sign_bit:
+            raw -= (sign_bit << 1)
+
+        if scaling:
+            raw = (signal.scale * raw + signal.offset)
+
+        if decode_choices and signal.choices is not None:
+            try:
+                raw = signal.choices[raw]
+            except (KeyError, TypeError):
+                pass
+
+        decoded[name] = raw
+
+
+def _decode_signals_with_raw(value, items, decode_choices, scaling, decoded):
+    """Same as _decode_signals(), but each decoded value is a
+    ``(raw, value)`` pair, where raw is neither scaled nor converted
+    to a choice string.
+
+    """
+
+    for signal, name, shift, mask, sign_bit, float_format in items:
+        raw = ((value >> shift) & mask)
+
+        if float_format is not None:
+            raw = struct.unpack(float_format[1],
+                                struct.pack(float_format[0], raw))[0]
+        elif raw & sign_bit:
+            raw -= (sign_bit << 1)
+
+        if scaling:
+            scaled = (signal.scale * raw + signal.offset)
+        else:
+            scaled = raw
+
+        if decode_choices and signal.choices is not None:
+            try:
+                scaled = signal.choices[scaled]
+            except (KeyError, TypeError):
+                pass
+
+        decoded[name] = (raw, scaled)
+
+
+def _decode_data(data,
+                 formats,
+                 decode_choices,
+                 scaling,
+                 decode_signals=_decode_signals):
+    decoded = {}
+
+    if formats.big_endian:
+        decode_signals(int(binascii.hexlify(data), 16),
+                       formats.big_endian,
+                       decode_choices,
+                       scaling,
+                       decoded)
+
+    if formats.little_endian:
+        decode_signals(int(binascii.hexlify(data[::-1]), 16),
+                       formats.little_endian,
+                       decode_choices,
+                       scaling,
+                       decoded)
+
+    return decoded
+
+
+def _decode_multiplexer_ids(values, multiplexers):
+    """Returns the raw multiplexer ids of given multiplexer items in given
+    big and little endian message data values, as a dispatch table
+    key.
+
+    """
+
+    ids = []
+
+    for _, index, shift, mask, sign_bit in multiplexers:
+        multiplexer_id = ((values[index] >> shift) & mask)
+
+        if multiplexer_id & sign_bit:
+            multiplexer_id -= (sign_bit << 1)
+
+        ids.append(multiplexer_id)
+
+    if len(ids) == 1:
+        return ids[0]
     else:
-        decoded_signal = value
-
-    return decoded_signal
-
-
-def _encode_data(data, signals, formats, scaling):
-    big_unpacked_data = [
-        _encode_signal(signal, data, scaling)
-        for signal in signals
-        if signal.byte_order == 'big_endian'
-    ]
-    little_unpacked_data = [
-        _encode_signal(signal, data, scaling)
-        for signal in signals
-        if signal.byte_order == 'little_endian'
-    ]
-    big_packed = formats.big_endian.pack(*big_unpacked_data)
-    little_packed = formats.little_endian.pack(*little_unpacked_data[::-1])[::-1]
-    packed_union = int(binascii.hexlify(big_packed), 16)
-    packed_union |= int(binascii.hexlify(little_packed), 16)
-
-    return packed_union
-
-
-def _decode_data(data, signals, formats, decode_choices, scaling):
-    big_unpacked = list(formats.big_endian.unpack(data))
-    big_signals = [
-        signal
-        for signal in signals
-        if signal.byte_order == 'big_endian'
-    ]
-    little_unpacked = list(formats.little_endian.unpack(data[::-1])[::-1])
-    little_signals = [
-        signal
-        for signal in signals
-        if signal.byte_order == 'little_endian'
-    ]
-    unpacked = big_unpacked + little_unpacked
-    signals = big_signals + little_signals
-
-    return {
-        signal.name: _decode_signal(signal,
-                                    value,
-                                    decode_choices,
-                                    scaling)
-        for signal, value in zip(signals, unpacked)
-    }
+        return tuple(ids)
+
+
+def _decode_array_signal(numpy, data, signal):
+    """Returns the raw values of given signal in given two dimensional
+    array of message data as a NumPy array.
+
+    """
+
+    if signal.byte_order == 'big_endian':
+        start = _start_bit(signal)
+    else:
+        start = signal.start
+
+    first = (start // 8)
+    last = ((start + signal.length - 1) // 8)
+    size = (last - first + 1)
+    window = data[:, first:last + 1]
+    available = window.shape[1]
+
+    if signal.byte_order == 'big_endian':
+        shift = (8 * size - (start - 8 * first) - signal.length)
+    else:
+        shift = (start - 8 * first)
+
+    mask = ((1 << signal.length) - 1)
+
+    if size <= 8:
+        padded = numpy.zeros((len(data), 8), dtype=numpy.uint8)
+
+        if signal.byte_order == 'big_endian':
+            padded[:, 8 - size:8 - size + available] = window
+            values = padded.view('>u8')[:, 0]
+        else:
+            padded[:, :available] = window
+            values = padded.view('<u8')[:, 0]
+
+        values = ((values >> numpy.uint64(shift)) & numpy.uint64(mask))
+
+        if signal.is_float:
+            if signal.length == 32:
+                values = values.astype(numpy.uint32).view(numpy.float32)
+            else:
+                values = values.view(numpy.float64)
+        elif signal.length < 64:
+            values = values.astype(numpy.int64)
+
+            if signal.is_signed:
+                sign_bit = numpy.int64(1 << (signal.length - 1))
+                values = ((values ^ sign_bit) - sign_bit)
+        elif signal.is_signed:
+            values = values.view(numpy.int64)
+    else:
+        # The signal does not fit in 64 bits, so Python integers are
+        # used instead.
+        if signal.byte_order == 'big_endian':
+            rows = [bytes(row) + b'\x00' * (size - available)
+                    for row in window]
+        else:
+            rows = [bytes(row[::-1]) for row in window]
+
+        values = [((int(b'0' + binascii.hexlify(row), 16) >> shift) & mask)
+                  for row in rows]
+
+        if signal.is_float:
+            float_format = FLOAT_FORMATS[signal.length]
+            values = [struct.unpack(float_format[1],
+                                    struct.pack(float_format[0], value))[0]
+                      for value in values]
+        elif signal.is_signed:
+            sign_bit = (1 << (signal.length - 1))
+            values = [((value ^ sign_bit) - sign_bit) for value in values]
+
+        values = numpy.array(values,
+                             dtype=(numpy.float64
+                                    if signal.is_float
+                                    else object))
+
+    return values
 
 
 class Message(object):
@@ -95,6 +331,25 @@ class Message(object):
 
     """
 
+    __slots__ = (
+        '_frame_id',
+        '_frame_id_range',
+        '_is_extended_frame',
+        '_name',
+        '_length',
+        '_signals',
+        '_name_to_signal',
+        '_comment',
+        '_nodes',
+        '_send_type',
+        '_cycle_time',
+        '_bus_name',
+        '_codecs',
+        '_signal_tree',
+        '_dispatch',
+        '_projected_dispatches'
+    )
+
     def __init__(self,
                  frame_id,
                  name,
@@ -105,20 +360,28 @@ class Message(object):
                  send_type=None,
                  cycle_time=None,
                  is_extended_frame=False,
-                 bus_name=None):
+                 bus_name=None,
+                 frame_id_range=None):
         self._frame_id = frame_id
+        self._frame_id_range = frame_id_range
         self._is_extended_frame = is_extended_frame
         self._name = name
         self._length = length
         self._signals = signals
         self._signals.sort(key=_start_bit)
+        self._name_to_signal = {signal.name: signal for signal in signals}
         self._comment = comment
         self._nodes = nodes
-        self._send_type = send_type
+        self._send_type = _intern(send_type)
         self._cycle_time = cycle_time
-        self._bus_name = bus_name
-        self._codecs = self._create_codec()
-        self._signal_tree = self._create_signal_tree(self._codecs)
+        self._bus_name = _intern(bus_name)
+        # The codecs, the signal tree and the dispatch table are created
+        # on first use, as databases often contain many more messages
+        # than are ever encoded or decoded.
+        self._codecs = None
+        self._signal_tree = None
+        self._dispatch = None
+        self._projected_dispatches = {}
 
     def _create_codec(self, parent_signal=None, multiplexer_id=None):
         """Create a codec of all signals with given parent signal. This is a
@@ -163,126 +426,228 @@ class Message(object):
 
         return {
             'signals': signals,
-            'formats': self._create_message_encode_decode_formats(signals),
             'multiplexers': multiplexers
         }
 
-    def _create_signal_tree(self, codec):
-        """Create a multiplexing tree node of given codec. This is a recursive
-        function.
+    def _create_projected_codec(self, codec, names):
+        """Create a copy of given codec with only signals in given set of
+        signal names, and the multiplexer signals needed to select
+        them. This is a recursive function.
 
         """
 
-        nodes = []
+        multiplexers = {}
 
-        for signal in codec['signals']:
-            multiplexers = codec['multiplexers']
+        for signal, children in codec['multiplexers'].items():
+            children = {
+                mux: self._create_projected_codec(child, names)
+                for mux, child in children.items()
+            }
 
-            if signal.name in multiplexers:
-                node = {
-                    signal.name: {
-                        mux: self._create_signal_tree(mux_codec)
-                        for mux, mux_codec in multiplexers[signal.name].items()
-                    }
-                }
-            else:
-                node = signal.name
+            if any(child['signals'] for child in children.values()):
+                multiplexers[signal] = children
 
-            nodes.append(node)
+        signals = [
+            signal
+            for signal in codec['signals']
+            if signal.name in names or signal.name in multiplexers
+        ]
 
-        return nodes
+        return {
+            'signals': signals,
+            'multiplexers': multiplexers
+        }
 
-    def _create_message_encode_decode_formats(self, signals):
-        message_length = (8 * self._length)
+    def _create_dispatch(self, codecs, signals):
+        """Create a multiplexer dispatch node of given codecs, whose signals
+        are in given list of signals. The table of the node maps the
+        raw ids of the codecs' multiplexer signals to a child node, or
+        a tuple of ids if there are more than one multiplexer
+        signal. Nodes without multiplexers are leaves with the formats
+        of all signals on their multiplexer path, so a message is
+        encoded or decoded with a single table lookup per multiplexer
+        level. This is a recursive function.
 
-        def get_format_string_type(signal):
-            if signal.is_float:
-                return 'f'
-            elif signal.is_signed:
-                return 's'
-            else:
-                return 'u'
+        """
 
-        def padding_item(length):
-            fmt = 'p{}'.format(length)
-            padding_mask = '1' * length
+        multiplexers = [
+            (name, children)
+            for codec in codecs
+            for name, children in sorted(codec['multiplexers'].items())
+        ]
+
+        if not multiplexers:
+            return {
+                'formats': self._create_message_encode_decode_formats(signals),
+                'multiplexers': [],
+                'table': {}
+            }
+
+        names = [name for name, _ in multiplexers]
+        formats = self._create_message_encode_decode_formats(
+            [signal for signal in signals if signal.name in names])
+        items = {}
+
+        for index, signal_items in enumerate([formats.big_endian,
+                                              formats.little_endian]):
+            for _, name, shift, mask, sign_bit, _ in signal_items:
+                items[name] = (name, index, shift, mask, sign_bit)
+
+        table = {}
+
+        for ids in itertools.product(*[sorted(children)
+                                       for _, children in multiplexers]):
+            children = [
+                multiplexers[i][1][multiplexer_id]
+                for i, multiplexer_id in enumerate(ids)
+            ]
+            children_signals = [
+                signal
+                for child in children
+                for signal in child['signals']
+            ]
+
+            if len(ids) == 1:
+                ids = ids[0]
+
+            table[ids] = self._create_dispatch(children,
+                                               signals + children_signals)
 
-            return fmt, padding_mask
+        return {
+            'formats': None,
+            'multiplexers': [items[name] for name in names],
+            'table': table
+        }
 
-        def signal_item(signal):
-            fmt = '{}{}'.format(get_format_string_type(signal),
-                                signal.length)
-            padding_mask = '0' * signal.length
+    def _get_codecs(self):
+        if self._codecs is None:
+            self._codecs = self._create_codec()
 
-            return fmt, padding_mask
+        return self._codecs
 
-        def fmt(items):
-            return ''.join([item[0] for item in items])
+    def _warm_up(self):
+        """Create the codecs, the signal tree and the dispatch table now
+        instead of on first use.
 
-        def padding_mask(items):
-            try:
-                return int(''.join([item[1] for item in items]), 2)
-            except ValueError:
-                return 0
+        """
 
-        def create_big():
-            items = [('>', '')]
-            start = 0
+        self._get_dispatch(None)
+        self.signal_tree
 
-            for signal in signals:
-                if signal.byte_order == 'little_endian':
-                    continue
+    def _get_dispatch(self, signals):
+        """Returns the dispatch table of all signals if `signals` is
+        ``None``, otherwise the dispatch table projected on given
+        signal names.
 
-                padding_length = (_start_bit(signal) - start)
+        """
 
-                if padding_length > 0:
-                    items.append(padding_item(padding_length))
+        if signals is None:
+            if self._dispatch is None:
+                codecs = self._get_codecs()
+                self._dispatch = self._create_dispatch([codecs],
+                                                       codecs['signals'])
 
-                items.append(signal_item(signal))
-                start = (_start_bit(signal) + signal.length)
+            return self._dispatch
 
-            if start < message_length:
-                length = message_length - start
-                items.append(padding_item(length))
+        names = frozenset(signals)
 
-            return fmt(items), padding_mask(items)
+        try:
+            return self._projected_dispatches[names]
+        except KeyError:
+            for name in names:
+                self.get_signal_by_name(name)
 
-        def create_little():
-            items = [('>', '')]
-            end = message_length
+            codecs = self._create_projected_codec(self._get_codecs(), names)
+            dispatch = self._create_dispatch([codecs], codecs['signals'])
+            self._projected_dispatches[names] = dispatch
 
-            for signal in signals[::-1]:
-                if signal.byte_order == 'big_endian':
-                    continue
+            return dispatch
 
-                padding_length = end - (signal.start + signal.length)
+    def _create_signal_tree(self, codec):
+        """Create a multiplexing tree node of given codec. This is a recursive
+        function.
 
-                if padding_length > 0:
-                    items.append(padding_item(padding_length))
+        """
 
-                items.append(signal_item(signal))
-                end = signal.start
+        nodes = []
 
-            if end > 0:
-                items.append(padding_item(end))
+        for signal in codec['signals']:
+            multiplexers = codec['multiplexers']
 
-            value = padding_mask(items)
+            if signal.name in multiplexers:
+                node = {
+                    signal.name: {
+                        mux: self._create_signal_tree(mux_codec)
+                        for mux, mux_codec in multiplexers[signal.name].items()
+                    }
+                }
+            else:
+                node = signal.name
+
+            nodes.append(node)
 
-            if message_length > 0:
-                value = bitstruct.pack('u{}'.format(message_length), value)
-                value = int(binascii.hexlify(value[::-1]), 16)
+        return nodes
 
-            return fmt(items), value
+    def _create_message_encode_decode_formats(self, signals):
+        """Create the encode and decode formats of given signals. Each
+        signal item is a tuple of the signal, its name and the shift,
+        mask, sign bit and float format used to find its raw value in
+        the message data interpreted as an unsigned integer.
 
-        big_fmt, big_padding_mask = create_big()
-        little_fmt, little_padding_mask = create_little()
+        """
 
-        Formats = namedtuple('Formats',
-                             ['big_endian', 'little_endian', 'padding_mask'])
+        message_length = (8 * self._length)
+
+        def signal_item(signal):
+            if signal.byte_order == 'big_endian':
+                shift = (message_length - _start_bit(signal) - signal.length)
+                mask = ((1 << signal.length) - 1)
+            else:
+                shift = signal.start
+                # Bits beyond the end of the message are not encoded.
+                mask = ((1 << max(min(signal.length,
+                                      message_length - shift),
+                                  0)) - 1)
 
-        return Formats(bitstruct.compile(big_fmt),
-                       bitstruct.compile(little_fmt),
-                       big_padding_mask & little_padding_mask)
+            if signal.is_float:
+                sign_bit = 0
+                float_format = FLOAT_FORMATS[signal.length]
+            elif signal.is_signed:
+                sign_bit = (1 << (signal.length - 1))
+                float_format = None
+            else:
+                sign_bit = 0
+                float_format = None
+
+            return (signal, signal.name, shift, mask, sign_bit, float_format)
+
+        def used_bits(items):
+            value = 0
+
+            for _, _, shift, mask, _, _ in items:
+                if shift >= 0:
+                    value |= (mask << shift)
+                else:
+                    value |= (mask >> -shift)
+
+            return (value & full_mask)
+
+        big_endian = [
+            signal_item(signal)
+            for signal in signals
+            if signal.byte_order == 'big_endian'
+        ]
+        little_endian = [
+            signal_item(signal)
+            for signal in signals
+            if signal.byte_order == 'little_endian'
+        ]
+        full_mask = ((1 << message_length) - 1)
+        padding_mask = full_mask
+        padding_mask &= ~used_bits(big_endian)
+        padding_mask &= ~_swap_bytes(used_bits(little_endian), self._length)
+
+        return Formats(big_endian, little_endian, padding_mask)
 
     @property
     def frame_id(self):
@@ -292,6 +657,16 @@ class Message(object):
 
         return self._frame_id
 
+    @property
+    def frame_id_range(self):
+        """The inclusive ``(minimum, maximum)`` range of frame ids the
+        message is sent with, or ``None`` if the message is only sent
+        with :attr:`.frame_id`, which is the minimum of the range.
+
+        """
+
+        return self._frame_id_range
+
     @property
     def is_extended_frame(self):
         """``True`` if the message is an extended frame, ``False`` otherwise.
@@ -379,33 +754,35 @@ class Message(object):
 
         """
 
+        if self._signal_tree is None:
+            self._signal_tree = self._create_signal_tree(self._get_codecs())
+
         return self._signal_tree
 
     def _get_mux_number(self, decoded, signal_name):
         mux = decoded[signal_name]
 
         if isinstance(mux, str):
-            signal = self.get_signal_by_name(signal_name)
-            mux = signal.choice_string_to_number(mux)
+            mux = self._name_to_signal[signal_name].choice_string_to_number(mux)
 
         return mux
 
     def _encode(self, node, data, scaling):
-        encoded = _encode_data(data,
-                               node['signals'],
-                               node['formats'],
-                               scaling)
-        padding_mask = node['formats'].padding_mask
-        multiplexers = node['multiplexers']
-
-        for signal in multiplexers:
-            mux = self._get_mux_number(data, signal)
-            node = multiplexers[signal][mux]
-            mux_encoded, mux_padding_mask = self._encode(node, data, scaling)
-            encoded |= mux_encoded
-            padding_mask &= mux_padding_mask
-
-        return encoded, padding_mask
+        while node['multiplexers']:
+            ids = [
+                self._get_mux_number(data, item[0])
+                for item in node['multiplexers']
+            ]
+
+            if len(ids) == 1:
+                node = node['table'][ids[0]]
+            else:
+                node = node['table'][tuple(ids)]
+
+        formats = node['formats']
+        encoded = _encode_data(data, formats, self._length, scaling)
+
+        return encoded, formats.padding_mask
 
     def encode(self, data, scaling=True, padding=False):
         """Encode given data as a message of this type.
@@ -420,36 +797,62 @@ class Message(object):
 
         """
 
-        encoded, padding_mask = self._encode(self._codecs, data, scaling)
+        encoded, padding_mask = self._encode(self._get_dispatch(None),
+                                             data,
+                                             scaling)
 
         if padding:
             encoded |= padding_mask
 
-        encoded |= (0x80 << (8 * self._length))
-        encoded = hex(encoded)[4:].rstrip('L')
-
-        return binascii.unhexlify(encoded)[:self._length]
+        return _pack_data(encoded, self._length)
+
+    def _decode(self,
+                node,
+                data,
+                decode_choices,
+                scaling,
+                decode_signals=_decode_signals):
+        if not node['multiplexers']:
+            return _decode_data(data,
+                                node['formats'],
+                                decode_choices,
+                                scaling,
+                                decode_signals)
+
+        values = (int(binascii.hexlify(data), 16),
+                  int(binascii.hexlify(data[::-1]), 16))
+
+        while node['multiplexers']:
+            ids = _decode_multiplexer_ids(values, node['multiplexers'])
+            node = node['table'][ids]
+
+        formats = node['formats']
+        decoded = {}
+        decode_signals(values[0],
+                       formats.big_endian,
+                       decode_choices,
+                       scaling,
+                       decoded)
+        decode_signals(values[1],
+                       formats.little_endian,
+                       decode_choices,
+                       scaling,
+                       decoded)
 
-    def _decode(self, node, data, decode_choices, scaling):
-        decoded = _decode_data(data,
-                               node['signals'],
-                               node['formats'],
-                               decode_choices,
-                               scaling)
+        return decoded
 
-        multiplexers = node['multiplexers']
+    def _check_data(self, data):
+        data = data[:self._length]
 
-        for signal in multiplexers:
-            mux = self._get_mux_number(decoded, signal)
-            node = multiplexers[signal][mux]
-            decoded.update(self._decode(node,
-                                        data,
-                                        decode_choices,
-                                        scaling))
+        if len(data) < self._length:
+            raise ValueError(
+                'unpack requires at least {} bits to unpack (got {})'.format(
+                    8 * self._length,
+                    8 * len(data)))
 
-        return decoded
+        return data
 
-    def decode(self, data, decode_choices=True, scaling=True):
+    def decode(self, data, decode_choices=True, scaling=True, signals=None):
         """Decode given data as a message of this type.
 
         If `decode_choices` is ``False`` scaled values are not
@@ -457,22 +860,182 @@ class Message(object):
 
         If `scaling` is ``False`` no scaling of signals is performed.
 
+        If `signals` is given, only signals with names in it are
+        decoded, along with the multiplexer signals needed to select
+        them. Raises a ``KeyError`` for unknown signal names.
+
         >>> foo = db.get_message_by_name('Foo')
         >>> foo.decode(b'\\x01\\x45\\x23\\x00\\x11')
         {'Bar': 1, 'Fum': 5.0}
+        >>> foo.decode(b'\\x01\\x45\\x23\\x00\\x11', signals=['Fum'])
+        {'Fum': 5.0}
 
         """
 
-        data = data[:self._length]
+        data = self._check_data(data)
 
-        return self._decode(self._codecs, data, decode_choices, scaling)
+        return self._decode(self._get_dispatch(signals),
+                            data,
+                            decode_choices,
+                            scaling)
+
+    def decode_with_raw(self,
+                        data,
+                        decode_choices=True,
+                        scaling=True,
+                        signals=None):
+        """Decode given data as a message of this type. Returns a
+        dictionary of signal name to ``(raw, value)`` entries, where
+        `raw` is the value as decoded by :meth:`.decode()` with
+        `decode_choices` and `scaling` set to ``False``, and `value` as
+        decoded with given `decode_choices` and `scaling`. Each signal
+        is only extracted once from the data.
+
+        See :meth:`.decode()` for a description of `decode_choices`,
+        `scaling` and `signals`.
+
+        >>> foo = db.get_message_by_name('Foo')
+        >>> foo.decode_with_raw(b'\\x01\\x45\\x23\\x00\\x11')
+        {'Bar': (1, 1), 'Fum': (50, 5.0)}
+
+        """
+
+        data = self._check_data(data)
+
+        return self._decode(self._get_dispatch(signals),
+                            data,
+                            decode_choices,
+                            scaling,
+                            _decode_signals_with_raw)
+
+    def decode_many(self,
+                    data_list,
+                    decode_choices=True,
+                    scaling=True,
+                    signals=None):
+        """Decode given iterable of data as messages of this type. Returns a
+        list of dictionaries of signal name-value entries, one per
+        data.
+
+        See :meth:`.decode()` for a description of `decode_choices`,
+        `scaling` and `signals`.
+
+        >>> foo = db.get_message_by_name('Foo')
+        >>> foo.decode_many([b'\\x01\\x45\\x23\\x00\\x11',
+        ...                  b'\\x01\\x45\\x23\\x00\\x12'])
+        [{'Bar': 1, 'Fum': 5.0}, {'Bar': 1, 'Fum': 5.1}]
+
+        """
+
+        check_data = self._check_data
+        dispatch = self._get_dispatch(signals)
+
+        if dispatch['multiplexers']:
+            decode = self._decode
+
+            return [
+                decode(dispatch, check_data(data), decode_choices, scaling)
+                for data in data_list
+            ]
+        else:
+            formats = dispatch['formats']
+
+            return [
+                _decode_data(check_data(data), formats, decode_choices, scaling)
+                for data in data_list
+            ]
+
+    def decode_array(self, data, scaling=True):
+        """Decode given two dimensional array-like of message data, one
+        message per row, as messages of this type. Returns a
+        dictionary of signal name to NumPy array entries. This method
+        requires NumPy.
+
+        Choices are not decoded. Signals in a multiplexed part of the
+        message are returned as masked arrays, where rows with another
+        multiplexer value are masked.
+
+        If `scaling` is ``False`` no scaling of signals is performed.
+
+        >>> foo = db.get_message_by_name('Foo')
+        >>> foo.decode_array(numpy.array([[1, 69, 35, 0, 17],
+        ...                               [1, 69, 35, 0, 18]],
+        ...                              dtype=numpy.uint8))
+        {'Bar': array([1, 1]), 'Fum': array([5. , 5.1])}
+
+        """
+
+        import numpy
+
+        data = numpy.asarray(data, dtype=numpy.uint8)
+
+        if data.ndim != 2:
+            raise ValueError(
+                'expected a two dimensional array, but got {} '
+                'dimension(s)'.format(data.ndim))
+
+        data = data[:, :self._length]
+
+        if data.shape[1] < self._length:
+            raise ValueError(
+                'unpack requires at least {} bits to unpack (got {})'.format(
+                    8 * self._length,
+                    8 * data.shape[1]))
+
+        raw = {}
+        valid = {}
+
+        def decode_node(node, rows):
+            for signal in node['signals']:
+                if signal.name not in raw:
+                    raw[signal.name] = _decode_array_signal(numpy,
+                                                            data,
+                                                            signal)
+
+                if rows is None:
+                    valid[signal.name] = None
+                elif signal.name in valid:
+                    valid[signal.name] = (valid[signal.name] | rows)
+                else:
+                    valid[signal.name] = rows
+
+            for signal, multiplexers in node['multiplexers'].items():
+                mux = raw[signal]
+
+                for multiplexer_id, mux_node in multiplexers.items():
+                    mux_rows = (mux == multiplexer_id)
+
+                    if rows is not None:
+                        mux_rows &= rows
+
+                    decode_node(mux_node, mux_rows)
+
+        decode_node(self._get_codecs(), None)
+        decoded = {}
 
-    def get_signal_by_name(self, name):
         for signal in self._signals:
-            if signal.name == name:
-                return signal
+            try:
+                values = raw[signal.name]
+            except KeyError:
+                continue
+
+            if scaling and (signal.scale != 1 or signal.offset != 0):
+                values = (signal.scale * values + signal.offset)
+
+            if valid[signal.name] is not None:
+                values = numpy.ma.masked_array(values,
+                                               mask=~valid[signal.name])
+
+            decoded[signal.name] = values
+
+        return decoded
+
+    def get_signal_by_name(self, name):
+        """Find the signal object for given name `name`.
+
+        """
 
-        raise KeyError(name)
+        return self._name_to_signal[name]
 
     def is_multiplexed(self):
         """Returns ``True`` if the message is multiplexed, otherwise
@@ -487,7 +1050,7 @@ class Message(object):
 
         """
 
-        return bool(self._codecs['multiplexers'])
+        return bool(self._get_codecs()['multiplexers'])
 
     def __repr__(self):
         return "message('{}', 0x{:x}, {}, {}, {})".format(
@@ -1,5 +1,31 @@
 # A CAN signal.
 
+try:
+    from sys import intern
+except ImportError:
+    # Python 2, where intern() is a builtin.
+    pass
+
+
+# The byte orders, so all signals share the same two strings.
+_BYTE_ORDERS = {
+    'little_endian': 'little_endian',
+    'big_endian': 'big_endian'
+}
+
+
+def _intern(string):
+    """Returns an interned copy of given string, or the string itself if
+    it cannot be interned, for example ``None``.
+
+    """
+
+    try:
+        return intern(string)
+    except TypeError:
+        return string
+
+
 class Signal(object):
     """A CAN signal with position, size, unit and other information. A
     signal is part of a message.
@@ -35,6 +61,27 @@ class Signal(object):
        Bit:    7      0 15     8 23    16 24
     """
 
+    __slots__ = (
+        '_name',
+        '_start',
+        '_length',
+        '_byte_order',
+        '_is_signed',
+        '_scale',
+        '_offset',
+        '_minimum',
+        '_maximum',
+        '_unit',
+        '_choices',
+        '_choice_string_to_number',
+        '_comment',
+        '_nodes',
+        '_is_multiplexer',
+        '_multiplexer_ids',
+        '_multiplexer_signal',
+        '_is_float'
+    )
+
     def __init__(self,
                  name,
                  start,
@@ -56,19 +103,22 @@ class Signal(object):
         self._name = name
         self._start = start
         self._length = length
-        self._byte_order = byte_order
+        self._byte_order = _BYTE_ORDERS.get(byte_order, byte_order)
         self._is_signed = is_signed
         self._scale = scale
         self._offset = offset
         self._minimum = minimum
         self._maximum = maximum
-        self._unit = unit
+        self._unit = _intern(unit)
         self._choices = choices
+        # Created on first use, as most choices are never encoded,
+        # and recreated if the choices are modified.
+        self._choice_string_to_number = None
         self._comment = comment
         self._nodes = [] if nodes is None else nodes
         self._is_multiplexer = is_multiplexer
         self._multiplexer_ids = multiplexer_ids
-        self._multiplexer_signal = multiplexer_signal
+        self._multiplexer_signal = _intern(multiplexer_signal)
         self._is_float = is_float
 
     @property
@@ -214,9 +264,33 @@ class Signal(object):
         return self._multiplexer_signal
 
     def choice_string_to_number(self, string):
-        for choice_number, choice_string in self.choices.items():
-            if choice_string == string:
-                return choice_number
+        """Returns the number of given choice string, or ``None`` if
+        unavailable.
+
+        """
+
+        try:
+            number = self._choice_string_to_number[string]
+        except (KeyError, TypeError):
+            number = None
+
+        # The index is rebuilt if the choices have been modified since
+        # it was created.
+        if number is None or self._choices.get(number) != string:
+            self._choice_string_to_number = self._create_choice_index()
+            number = self._choice_string_to_number.get(string)
+
+        return number
+
+    def _create_choice_index(self):
+        choice_string_to_number = {}
+
+        if self._choices is not None:
+            for choice_number, choice_string in self._choices.items():
+                choice_string_to_number.setdefault(choice_string,
+                                                   choice_number)
+
+        return choice_string_to_number
 
     def __repr__(self):
         if self._choices is None:
@@ -1,5 +1,8 @@
+import io
+import json
 import math
 import os
+import threading
 import unittest
 
 try:
@@ -8,6 +11,10 @@ except ImportError:
     from mock import patch
 
 import logging
+import shutil
+import subprocess
+import sys
+import tempfile
 from xml.etree import ElementTree
 import timeit
 
@@ -16,6 +23,11 @@ try:
 except ImportError:
     from io import StringIO
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 import cantools
 
 
@@ -519,6 +531,129 @@ class CanToolsTest(unittest.TestCase):
         decoded = db.decode_message(frame_id, encoded)
         self.assertEqual(decoded, decoded_message)
 
+    def test_decode_many(self):
+        filename = os.path.join('tests', 'files', 'socialledge.dbc')
+        db = cantools.db.load_file(filename)
+
+        frames = [
+            (200, b'\xf0\x00\x00\x00\x00\x00\x00\x00'),
+            (100, b'\xf0\x01\xff\xff\xff\xff\xff\xff'),
+            (200, b'\xf1\x00\x00\x00\x00\x00\x00\x00'),
+            (500, b'\x01\x02\x03\x04')
+        ]
+
+        decoded = db.decode_messages(frames)
+        self.assertEqual(decoded,
+                         [db.decode_message(frame_id, data)
+                          for frame_id, data in frames])
+
+        decoded = db.decode_messages(frames, decode_choices=False, scaling=False)
+        self.assertEqual(decoded,
+                         [db.decode_message(frame_id,
+                                            data,
+                                            decode_choices=False,
+                                            scaling=False)
+                          for frame_id, data in frames])
+
+        message = db.get_message_by_frame_id(500)
+        data_list = [b'\x01\x02\x03\x04', b'\x05\x01\x03\x04']
+        self.assertEqual(message.decode_many(data_list),
+                         [message.decode(data) for data in data_list])
+
+        with self.assertRaises(KeyError):
+            db.decode_messages([(499, b'\x01\x02\x03')])
+
+        with self.assertRaises(ValueError):
+            message.decode_many([b'\x01\x02\x03'])
+
+    def test_decode_with_raw(self):
+        filename = os.path.join('tests', 'files', 'socialledge.dbc')
+        db = cantools.db.load_file(filename)
+
+        message = db.get_message_by_frame_id(500)
+        self.assertEqual(message.decode_with_raw(b'\x01\x02\x03\x04'),
+                         {
+                             'IO_DEBUG_test_unsigned': (1, 1),
+                             'IO_DEBUG_test_enum': (2, 'IO_DEBUG_test2_enum_two'),
+                             'IO_DEBUG_test_signed': (3, 3),
+                             'IO_DEBUG_test_float': (4, 2.0)
+                         })
+        self.assertEqual(message.decode_with_raw(b'\x01\x02\x03\x04',
+                                                 decode_choices=False,
+                                                 scaling=False,
+                                                 signals=['IO_DEBUG_test_enum']),
+                         {'IO_DEBUG_test_enum': (2, 2)})
+
+        # Multiplexed.
+        message = db.get_message_by_frame_id(200)
+
+        for data in [b'\xf0\x00\x00\x00\x00\x00\x00\x00',
+                     b'\xf1\x00\x12\x00\x00\x00\x00\x00']:
+            raw = message.decode(data, decode_choices=False, scaling=False)
+            decoded = message.decode(data)
+            self.assertEqual(message.decode_with_raw(data),
+                             {name: (raw[name], decoded[name])
+                              for name in decoded})
+
+        with self.assertRaises(ValueError):
+            message.decode_with_raw(b'\x01\x02\x03')
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_decode_array(self):
+        filename = os.path.join('tests', 'files', 'multiplex_choices.dbc')
+        db = cantools.db.load_file(filename)
+        message = db.messages[0]
+        data_list = [
+            message.encode({
+                'Multiplexor': 'MULTIPLEXOR_8',
+                'BIT_C': 1, 'BIT_G': 0, 'BIT_J': 1, 'BIT_L': 'On'
+            }),
+            message.encode({
+                'Multiplexor': 'MULTIPLEXOR_24',
+                'BIT_A': 1, 'BIT_B': 0, 'BIT_C': 1, 'BIT_D': 1,
+                'BIT_E': 0, 'BIT_F': 1, 'BIT_G': 0, 'BIT_H': 1, 'BIT_J': 0,
+                'BIT_K': 1, 'BIT_L': 'Off'
+            })
+        ]
+        data = numpy.array([bytearray(data) for data in data_list],
+                           dtype=numpy.uint8)
+
+        decoded = message.decode_array(data)
+
+        for i, encoded in enumerate(data_list):
+            expected = message.decode(encoded, decode_choices=False)
+
+            for name, values in decoded.items():
+                if name in expected:
+                    self.assertEqual(values[i], expected[name])
+                else:
+                    self.assertIs(values[i], numpy.ma.masked)
+
+        # Signed, scaled and 64 bits signals.
+        filename = os.path.join('tests', 'files', 'foobar.dbc')
+        db = cantools.db.load_file(filename)
+        data_list = [
+            b'\x01\x45\x23\x00\x11\x00\x00\x00',
+            b'\xfe\xff\xff\xbf\xff\xff\xff\xff'
+        ]
+        data = numpy.array([bytearray(data) for data in data_list],
+                           dtype=numpy.uint8)
+
+        for message in db.messages[:3]:
+            decoded = message.decode_array(data)
+
+            for i, encoded in enumerate(data_list):
+                expected = message.decode(encoded, decode_choices=False)
+
+                for name, values in decoded.items():
+                    self.assertAlmostEqual(values[i], expected[name])
+
+        with self.assertRaises(ValueError) as cm:
+            db.messages[0].decode_array(data[:, :3])
+
+        self.assertEqual(str(cm.exception),
+                         'unpack requires at least 64 bits to unpack (got 24)')
+
     def test_add_message(self):
         db = cantools.db.File()
 
@@ -573,6 +708,43 @@ class CanToolsTest(unittest.TestCase):
 
         self.assertEqual(str(cm.exception), "'Fum'")
 
+    def test_warm_up(self):
+        filename = os.path.join('tests', 'files', 'multiplex.dbc')
+        db = cantools.db.load_file(filename)
+        db.warm_up()
+        db.warm_up([db.messages[0].frame_id])
+
+        with self.assertRaises(KeyError):
+            db.warm_up([0x7ff])
+
+        decoded = db.decode_message(db.messages[0].frame_id,
+                                    b'\x20\x00\x8c\x01\x00\x00\x00\x00')
+        self.assertEqual(decoded,
+                         {
+                             'Multiplexor': 8,
+                             'BIT_C': 1, 'BIT_G': 1, 'BIT_J': 1, 'BIT_L': 1
+                         })
+
+    def test_choice_string_to_number(self):
+        filename = os.path.join('tests', 'files', 'foobar.dbc')
+        db = cantools.db.load_file(filename)
+
+        signal = db.get_message_by_name('Foo').get_signal_by_name('Foo')
+        self.assertEqual(signal.choice_string_to_number('Foo'), -1)
+        self.assertEqual(signal.choice_string_to_number('Fie'), -2)
+        self.assertEqual(signal.choice_string_to_number('Fum'), None)
+
+        signal = db.get_message_by_name('Foo').get_signal_by_name('Bar')
+        self.assertEqual(signal.choice_string_to_number('Foo'), None)
+
+        # Modified choices are found.
+        signal = db.get_message_by_name('Foo').get_signal_by_name('Foo')
+        signal.choices[-3] = 'Fum'
+        signal.choices[-2] = 'Fee'
+        self.assertEqual(signal.choice_string_to_number('Fum'), -3)
+        self.assertEqual(signal.choice_string_to_number('Fee'), -2)
+        self.assertEqual(signal.choice_string_to_number('Fie'), None)
+
     def test_command_line_decode(self):
         argv = ['cantools', 'decode', 'tests/files/socialledge.dbc']
         input_data = """\
@@ -603,6 +775,260 @@ class CanToolsTest(unittest.TestCase):
                     actual_output = stdout.getvalue()
                     self.assertEqual(actual_output, expected_output)
 
+    def test_command_line_decode_jobs(self):
+        input_data = """\
+  vcan0  0C8   [8]  F0 00 00 00 00 00 00 00
+  vcan0  064   [10]  F0 01 FF FF FF FF FF FF FF FF
+  vcan0  ERROR
+
+  vcan0  1F4   [4]  01 02 03 04
+  vcan0  1F4   [3]  01 02 03
+  vcan0  1F3   [3]  01 02 03
+""" * 5
+        outputs = []
+
+        for jobs in ['1', '2']:
+            argv = ['cantools', 'decode', '--jobs', jobs,
+                    'tests/files/socialledge.dbc']
+            stdout = StringIO()
+
+            with patch('sys.stdin', StringIO(input_data)):
+                with patch('sys.stdout', stdout):
+                    with patch('sys.argv', argv):
+                        with patch('cantools.DECODE_CHUNK_SIZE', 4):
+                            cantools._main()
+
+            outputs.append(stdout.getvalue())
+
+        self.assertEqual(len(outputs[0].splitlines()), 36)
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_command_line_decode_live(self):
+        """Frames are printed as they are read, before the end of the
+        input.
+
+        """
+
+        argv = ['cantools', 'decode', 'tests/files/socialledge.dbc']
+        read_fd, write_fd = os.pipe()
+        stdout = StringIO()
+
+        with io.open(read_fd, 'r', encoding='utf-8') as stdin:
+            with patch('sys.stdin', stdin):
+                with patch('sys.stdout', stdout):
+                    with patch('sys.argv', argv):
+                        thread = threading.Thread(target=cantools._main)
+                        thread.daemon = True
+                        thread.start()
+
+                        try:
+                            os.write(write_fd,
+                                     b'  vcan0  064   [10]  F0 01 FF FF FF '
+                                     b'FF FF FF FF FF\n')
+
+                            for _ in range(1000):
+                                if 'DRIVER_HEARTBEAT' in stdout.getvalue():
+                                    break
+
+                                thread.join(0.01)
+
+                            self.assertIn('DRIVER_HEARTBEAT', stdout.getvalue())
+                        finally:
+                            os.close(write_fd)
+                            thread.join(10)
+
+        self.assertTrue(stdout.getvalue().endswith(']\n'))
+
+    def test_command_line_decode_ndjson(self):
+        argv = ['cantools', 'decode', '--format', 'ndjson', '-t',
+                'tests/files/socialledge.dbc']
+        input_data = """\
+  vcan0  064   [10]  F0 01 FF FF FF FF FF FF FF FF
+  vcan0  ERROR
+ (12.5)  vcan0  1F4   [3]  01 02 03
+  vcan0  1F3   [3]  01 02 03
+"""
+        expected_output = """\
+{"timestamp": 0, "message": {"id": 100, "name": "DRIVER_HEARTBEAT", "signals": [{"name": "DRIVER_HEARTBEAT_cmd", "raw_value": 240, "computed_value": 240}]}}
+{"timestamp": "  vcan0  ERROR", "message": null}
+{"timestamp": 12500, "message": "unpack requires at least 32 bits to unpack (got 24)"}
+{"timestamp": 0, "message": "Unknown frame id 499"}
+"""
+
+        stdout = StringIO()
+
+        with patch('sys.stdin', StringIO(input_data)):
+            with patch('sys.stdout', stdout):
+                with patch('sys.argv', argv):
+                    cantools._main()
+
+        self.assertEqual(stdout.getvalue(), expected_output)
+
+    def test_command_line_decode_ndjson_live(self):
+        """Each NDJSON frame is written to a pipe as soon as it is
+        decoded, by one or more processes.
+
+        """
+
+        env = dict(os.environ)
+        env.pop('PYTHONUNBUFFERED', None)
+
+        for jobs in ['1', '2']:
+            process = subprocess.Popen(
+                [sys.executable, '-c', 'import cantools; cantools._main()',
+                 'decode', '--format', 'ndjson', '--jobs', jobs,
+                 'tests/files/socialledge.dbc'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                env=env)
+            lines = []
+
+            def read_line():
+                lines.append(process.stdout.readline())
+
+            try:
+                for number_of_lines in range(1, 3):
+                    thread = threading.Thread(target=read_line)
+                    thread.daemon = True
+                    thread.start()
+                    process.stdin.write(b'  vcan0  064   [10]  F0 01 FF FF FF '
+                                        b'FF FF FF FF FF\n')
+                    process.stdin.flush()
+                    thread.join(10)
+
+                    # Written before the input is closed.
+                    self.assertEqual(len(lines), number_of_lines)
+            finally:
+                process.stdin.close()
+                process.wait()
+
+            for line in lines:
+                self.assertEqual(
+                    json.loads(line.decode('utf-8'))['message']['name'],
+                    'DRIVER_HEARTBEAT')
+
+            self.assertEqual(process.stdout.read(), b'')
+            process.stdout.close()
+
+    def test_command_line_decode_bad_positive_options(self):
+        for option in ['--jobs',
+                       '--csv-flush-size',
+                       '--csv-max-buffered-rows',
+                       '--csv-max-open-files']:
+            for value in ['0', '-1', 'a']:
+                argv = ['cantools', 'decode', '-o', 'output', option, value,
+                        'tests/files/socialledge.dbc']
+                stderr = StringIO()
+
+                with patch('sys.stderr', stderr):
+                    with patch('sys.argv', argv):
+                        with self.assertRaises(SystemExit) as cm:
+                            cantools._main()
+
+                self.assertEqual(cm.exception.code, 2)
+                self.assertIn(
+                    "{}: invalid positive integer value: '{}'".format(
+                        option,
+                        value),
+                    stderr.getvalue())
+
+    def test_dump_json_value(self):
+        for value in [0, -5, 1.5, -0.1, 1e300, float('nan'), float('inf'),
+                      True, None, 'On', u'\xe5']:
+            self.assertEqual(cantools._dump_json_value(value),
+                             json.dumps(value, ensure_ascii=False))
+
+    def test_signal_writer(self):
+        output_folder = tempfile.mkdtemp()
+
+        try:
+            writer = cantools._SignalWriter(output_folder,
+                                            flush_size=2,
+                                            max_buffered_rows=3,
+                                            max_open_files=1)
+
+            for timestamp in range(5):
+                writer.write(timestamp, 'Foo', [('A', timestamp, 0.5),
+                                                ('B', 1, 'On')])
+                writer.write(timestamp, 'Bar', [('A', 2, 2.0)])
+
+            writer.close()
+
+            expected = {
+                ('Foo', 'A'): ['0;0;0.5', '1;1;0.5', '2;2;0.5', '3;3;0.5',
+                               '4;4;0.5'],
+                ('Foo', 'B'): ['{};1;On'.format(i) for i in range(5)],
+                ('Bar', 'A'): ['{};2;2.0'.format(i) for i in range(5)]
+            }
+
+            for (message_name, name), rows in expected.items():
+                path = os.path.join(output_folder, message_name, name + '.csv')
+
+                with open(path) as fin:
+                    self.assertEqual(fin.read().splitlines(),
+                                     ['timestamp;raw_value;computed_value']
+                                     + rows)
+        finally:
+            shutil.rmtree(output_folder)
+
+    def test_parse_candump_line(self):
+        data_list = [
+            ('  vcan0  1F4   [4]  01 02 03 04',
+             (0, 0x1f4, b'\x01\x02\x03\x04')),
+            ('  vcan0  1F4   [0]',
+             (0, 0x1f4, b'')),
+            (' (1378.006329)  can0   0B2   [8]  F9 0D 04 0E 0A 0E 11 0E',
+             (1378006, 0xb2, b'\xf9\x0d\x04\x0e\x0a\x0e\x11\x0e')),
+            ('(1436509052.249713) vcan0 044#2A366C2BBA',
+             (1436509052249, 0x44, b'\x2a\x36\x6c\x2b\xba')),
+            ('(1436509052.249713) vcan0 123##10011223344',
+             (1436509052249, 0x123, b'\x00\x11\x22\x33\x44')),
+            ('  vcan0  ERROR',
+             (0, None, None)),
+            ('',
+             (0, None, None))
+        ]
+
+        for line, expected in data_list:
+            self.assertEqual(cantools._parse_candump_line(line), expected)
+
+    def test_read_lines(self):
+        with patch('cantools.READ_SIZE', 4):
+            lines = list(cantools._read_lines(StringIO('ab\ncdefgh\n\nij')))
+
+        self.assertEqual(lines, ['ab', 'cdefgh', '', 'ij'])
+
+    def test_read_lines_pipe(self):
+        """Lines are returned as soon as they are written to a pipe, not
+        when the pipe is closed.
+
+        """
+
+        read_fd, write_fd = os.pipe()
+        fin = io.open(read_fd, 'r', encoding='utf-8')
+        lines = cantools._read_lines(fin)
+
+        def read_line(data):
+            result = []
+            thread = threading.Thread(target=lambda: result.append(next(lines)))
+            thread.daemon = True
+            thread.start()
+            os.write(write_fd, data)
+            thread.join(10)
+
+            return result
+
+        try:
+            self.assertEqual(read_line(b'ab\ncd'), ['ab'])
+            # A multi byte character split between two writes.
+            os.write(write_fd, b'\xc3')
+            self.assertEqual(read_line(b'\xa4\nef'), [u'cd\xe4'])
+        finally:
+            os.close(write_fd)
+
+        self.assertEqual(list(lines), ['ef'])
+        fin.close()
+
     def test_the_homer(self):
         filename = os.path.join('tests', 'files', 'the_homer.kcd')
         db = cantools.db.load_file(filename)
@@ -810,13 +1236,14 @@ class CanToolsTest(unittest.TestCase):
         db = cantools.db.File()
         db.add_sym_file(filename)
 
-        self.assertEqual(len(db.messages), 6)
+        self.assertEqual(len(db.messages), 5)
         self.assertEqual(len(db.messages[0].signals), 0)
 
         # Message1.
-        message_1 = db.messages[3]
+        message_1 = db.messages[2]
         self.assertEqual(len(message_1.signals), 2)
         self.assertEqual(message_1.frame_id, 0)
+        self.assertEqual(message_1.frame_id_range, None)
         self.assertEqual(message_1.is_extended_frame, False)
         self.assertEqual(message_1.name, 'Message1')
         self.assertEqual(message_1.length, 8)
@@ -866,6 +1293,8 @@ class CanToolsTest(unittest.TestCase):
         # Message2.
         message_2 = db.messages[1]
         self.assertEqual(message_2.frame_id, 0x22)
+        self.assertEqual(message_2.frame_id_range, (0x22, 0x23))
+        self.assertIs(db.get_message_by_frame_id(0x23), message_2)
         self.assertEqual(message_2.is_extended_frame, True)
         self.assertEqual(message_2.name, 'Message2')
         self.assertEqual(message_2.length, 8)
@@ -896,7 +1325,7 @@ class CanToolsTest(unittest.TestCase):
         self.assertEqual(signal_3.is_float, False)
 
         # Symbol2.
-        signal_4 = db.messages[4].signals[0]
+        signal_4 = db.messages[3].signals[0]
         self.assertEqual(signal_4.name, 'Signal4')
         self.assertEqual(signal_4.start, 0)
         self.assertEqual(signal_4.length, 64)
@@ -915,7 +1344,7 @@ class CanToolsTest(unittest.TestCase):
         self.assertEqual(signal_4.is_float, True)
 
         # Symbol3.
-        symbol_3 = db.messages[5]
+        symbol_3 = db.messages[4]
         self.assertEqual(symbol_3.frame_id, 0x33)
         self.assertEqual(symbol_3.length, 8)
         self.assertEqual(symbol_3.is_multiplexed(), True)
@@ -972,6 +1401,147 @@ class CanToolsTest(unittest.TestCase):
             'Invalid SYM syntax at line 2, column 1: \'>!<Foo="Jopp"\': '
             'Expected "Title".')
 
+    def test_sym_frame_id_range(self):
+        db = cantools.db.load_string('FormatVersion=6.0\n'
+                                     'Title="Ranges"\n'
+                                     '{ENUMS}\n'
+                                     '{SIGNALS}\n'
+                                     'Sig=Signal1 unsigned 8\n'
+                                     '{SEND}\n'
+                                     '[Wide]\n'
+                                     'ID=00000000h-1FFFFFFFh\n'
+                                     'Len=1\n'
+                                     'Sig=Signal1 7\n'
+                                     '[Narrow]\n'
+                                     'ID=100h-1FFh\n'
+                                     'Len=1\n'
+                                     'Sig=Signal1 7\n'
+                                     '[Single]\n'
+                                     'ID=180h\n'
+                                     'Len=1\n'
+                                     'Sig=Signal1 7\n'
+                                     '{RECEIVE}\n'
+                                     '{SENDRECEIVE}\n')
+
+        self.assertEqual(len(db.messages), 3)
+        wide, narrow, single = db.messages
+        self.assertEqual(wide.frame_id, 0)
+        self.assertEqual(wide.frame_id_range, (0, 0x1fffffff))
+        self.assertEqual(wide.is_extended_frame, True)
+        self.assertEqual(narrow.frame_id_range, (0x100, 0x1ff))
+        self.assertEqual(single.frame_id_range, None)
+
+        # Exact frame ids first, then the last added range.
+        self.assertIs(db.get_message_by_frame_id(0x180), single)
+        self.assertIs(db.get_message_by_frame_id(0x1a0), narrow)
+        self.assertIs(db.get_message_by_frame_id(0x200), wide)
+        self.assertIs(db.get_message_by_frame_id(0x1fffffff), wide)
+
+        with self.assertRaises(KeyError):
+            db.get_message_by_frame_id(0x20000000)
+
+        self.assertEqual(db.encode_message('Narrow', {'Signal1': 5}), b'\x05')
+        self.assertEqual(db.decode_message(0x1a0, b'\x05'), {'Signal1': 5})
+
+    def test_frame_id_range_index(self):
+        db = cantools.db.File()
+        messages = []
+
+        # Many disjoint ranges with gaps between them.
+        for i in range(1000):
+            message = cantools.db.Message(frame_id=10 * i,
+                                          name='M{}'.format(i),
+                                          length=0,
+                                          signals=[],
+                                          frame_id_range=(10 * i, 10 * i + 4))
+            db.add_message(message)
+            messages.append(message)
+
+        self.assertIs(db.get_message_by_frame_id(3), messages[0])
+        self.assertIs(db.get_message_by_frame_id(5004), messages[500])
+        self.assertIs(db.get_message_by_frame_id(9994), messages[999])
+
+        for frame_id in [5, 5005, 9995, 20000]:
+            with self.assertRaises(KeyError):
+                db.get_message_by_frame_id(frame_id)
+
+        # Overlapping ranges, where the last added range wins.
+        outer = cantools.db.Message(frame_id=5002,
+                                    name='Outer',
+                                    length=0,
+                                    signals=[],
+                                    frame_id_range=(5002, 5033))
+        inner = cantools.db.Message(frame_id=5010,
+                                    name='Inner',
+                                    length=0,
+                                    signals=[],
+                                    frame_id_range=(5010, 5012))
+        db.add_message(outer)
+        db.add_message(inner)
+
+        expected = {
+            5001: messages[500],
+            5003: outer,
+            5009: outer,
+            5010: inner,
+            5011: inner,
+            5013: outer,
+            5033: outer,
+            5034: messages[503]
+        }
+
+        for frame_id, message in expected.items():
+            self.assertIs(db.get_message_by_frame_id(frame_id), message)
+
+        with self.assertRaises(KeyError):
+            db.get_message_by_frame_id(5035)
+
+    def test_sym_multiplexed_shared_signals(self):
+        db = cantools.db.load_string('FormatVersion=6.0\n'
+                                     'Title="Shared"\n'
+                                     '{ENUMS}\n'
+                                     '{SIGNALS}\n'
+                                     'Sig=Counter unsigned 8\n'
+                                     'Sig=Value unsigned 8\n'
+                                     '{SEND}\n'
+                                     '[Diag]\n'
+                                     'ID=700h\n'
+                                     'Len=3\n'
+                                     'Mux=Service 7,8 0\n'
+                                     'Sig=Counter 15\n'
+                                     '[Diag]\n'
+                                     'Len=3\n'
+                                     'Mux=Service 7,8 1\n'
+                                     'Sig=Counter 15\n'
+                                     'Sig=Value 23\n'
+                                     '[Diag]\n'
+                                     'Len=3\n'
+                                     'Mux=Service 7,8 2\n'
+                                     'Sig=Counter 23\n'
+                                     '{RECEIVE}\n'
+                                     '{SENDRECEIVE}\n')
+
+        self.assertEqual(len(db.messages), 1)
+        message = db.messages[0]
+
+        # Counter is shared by variants 0 and 1, but not 2 as its
+        # start bit differs.
+        self.assertEqual(
+            [(signal.name, signal.start, signal.multiplexer_ids)
+             for signal in message.signals],
+            [
+                ('Service', 7, None),
+                ('Counter', 15, [0, 1]),
+                ('Value', 23, [1]),
+                ('Counter', 23, [2])
+            ])
+
+        for data in [{'Service': 0, 'Counter': 5},
+                     {'Service': 1, 'Counter': 5, 'Value': 6},
+                     {'Service': 2, 'Counter': 5}]:
+            encoded = message.encode(data)
+            self.assertEqual(message.decode(encoded), data)
+
     def test_load_bad_format(self):
         with self.assertRaises(cantools.db.UnsupportedDatabaseFormatError):
             cantools.db.load(StringIO(''))
@@ -984,6 +1554,38 @@ class CanToolsTest(unittest.TestCase):
 
         self.assertEqual(str(cm.exception), 'syntax error: line 1, column 0')
 
+    def test_add_kcd_file_object(self):
+        filename = os.path.join('tests', 'files', 'the_homer.kcd')
+
+        with open(filename, 'r') as fin:
+            string = fin.read()
+
+        db = cantools.db.File()
+        db.add_kcd_string(string)
+        db_fp = cantools.db.File()
+        db_fp.add_kcd(StringIO(string))
+
+        self.assertEqual(repr(db_fp), repr(db))
+        self.assertEqual([(bus.name, bus.baudrate) for bus in db_fp.buses],
+                         [(bus.name, bus.baudrate) for bus in db.buses])
+        self.assertEqual([message.bus_name for message in db_fp.messages],
+                         [message.bus_name for message in db.messages])
+
+        # Same error as when parsing the string.
+        with self.assertRaises(ElementTree.ParseError) as cm:
+            db_fp.add_kcd(StringIO(string[:-20]))
+
+        with self.assertRaises(ElementTree.ParseError) as cm_string:
+            db.add_kcd_string(string[:-20])
+
+        self.assertEqual(str(cm.exception), str(cm_string.exception))
+
+        with self.assertRaises(cantools.db.UnsupportedDatabaseFormatError) as cm:
+            cantools.db.load(StringIO(string[:-20]), database_format='kcd')
+
+        self.assertEqual(str(cm.exception),
+                         'KCD: "{}"'.format(cm_string.exception))
+
     def test_bus(self):
         bus = cantools.db.bus.Bus('foo')
         self.assertEqual(repr(bus), "bus('foo', None)")
@@ -991,6 +1593,33 @@ class CanToolsTest(unittest.TestCase):
         bus = cantools.db.bus.Bus('foo', 'bar')
         self.assertEqual(repr(bus), "bus('foo', 'bar')")
 
+    def test_compact_objects(self):
+        db = cantools.db.load_file('tests/files/vehicle.dbc')
+        message = db.messages[0]
+        signal = message.signals[0]
+
+        for item in [db.nodes[0], message, signal, cantools.db.bus.Bus('foo')]:
+            self.assertFalse(hasattr(item, '__dict__'))
+
+        # Repeated strings are shared by all signals.
+        last_signal = db.messages[-1].signals[-1]
+        self.assertIs(signal.byte_order, last_signal.byte_order)
+        self.assertIs(signal.nodes[0], last_signal.nodes[0])
+
+        # Equal choices share their strings, but not their dictionary.
+        message = db.get_message_by_frame_id(156790050)
+        roll_choices = message.get_signal_by_name('Validity_Roll').choices
+        pitch_choices = message.get_signal_by_name('Validity_Pitch').choices
+        self.assertEqual(roll_choices, pitch_choices)
+        self.assertIsNot(roll_choices, pitch_choices)
+        self.assertIs(roll_choices[1], pitch_choices[1])
+        roll_choices[5] = 'x'
+        self.assertNotIn(5, pitch_choices)
+        self.assertEqual(
+            message.get_signal_by_name('Validity_Pitch').choice_string_to_number(
+                'Valid'),
+            1)
+
     def test_num(self):
         self.assertEqual(cantools.db.formats.utils.num('1'), 1)
         self.assertEqual(cantools.db.formats.utils.num('1.0'), 1.0)
@@ -1085,6 +1714,80 @@ class CanToolsTest(unittest.TestCase):
             decoded = message_1.decode(encoded)
             self.assertEqual(decoded, decoded_message)
 
+    def test_multiplex_dispatch_raw_ids(self):
+        """Multiplexed parts are selected by the raw multiplexer value, also
+        when the multiplexer signal is scaled.
+
+        """
+
+        signals = [
+            cantools.db.Signal('M', 0, 4, scale=10, is_multiplexer=True),
+            cantools.db.Signal('A',
+                               4,
+                               4,
+                               multiplexer_ids=[1],
+                               multiplexer_signal='M'),
+            cantools.db.Signal('B',
+                               4,
+                               4,
+                               multiplexer_ids=[2],
+                               multiplexer_signal='M')
+        ]
+
+        message = cantools.db.Message(frame_id=1,
+                                      name='M0',
+                                      length=1,
+                                      signals=signals)
+
+        self.assertEqual(message.decode(b'\x51'), {'M': 10, 'A': 5})
+        self.assertEqual(message.decode(b'\x62'), {'M': 20, 'B': 6})
+        self.assertEqual(message.decode(b'\x62', scaling=False),
+                         {'M': 2, 'B': 6})
+
+        with self.assertRaises(KeyError):
+            message.decode(b'\x03')
+
+    def test_decode_signals(self):
+        filename = os.path.join('tests', 'files', 'multiplex.dbc')
+        db = cantools.db.load_file(filename)
+        message_1 = db.messages[0]
+
+        # Signal BIT_A is only available for multiplexer id 24.
+        decoded = message_1.decode(b'\x60\x00\x8c\x35\xc3\x00\x00\x00',
+                                   signals=['BIT_A', 'BIT_L'])
+        self.assertEqual(decoded, {'Multiplexor': 24, 'BIT_A': 1, 'BIT_L': 1})
+
+        decoded = message_1.decode(b'\x20\x00\x8c\x01\x00\x00\x00\x00',
+                                   signals=['BIT_A', 'BIT_L'])
+        self.assertEqual(decoded, {'Multiplexor': 8, 'BIT_L': 1})
+
+        decoded = db.decode_message(message_1.frame_id,
+                                    b'\x20\x00\x8c\x01\x00\x00\x00\x00',
+                                    signals=['Multiplexor'])
+        self.assertEqual(decoded, {'Multiplexor': 8})
+
+        data_list = [
+            b'\x20\x00\x8c\x01\x00\x00\x00\x00',
+            b'\x60\x00\x8c\x35\xc3\x00\x00\x00'
+        ]
+        decoded = message_1.decode_many(data_list, signals=['BIT_A'])
+        self.assertEqual(decoded, [{'Multiplexor': 8},
+                                   {'Multiplexor': 24, 'BIT_A': 1}])
+
+        with self.assertRaises(KeyError) as cm:
+            message_1.decode(b'\x20\x00\x8c\x01\x00\x00\x00\x00',
+                             signals=['BIT_Z'])
+
+        self.assertEqual(str(cm.exception), "'BIT_Z'")
+
+        # Non-multiplexed message.
+        filename = os.path.join('tests', 'files', 'motohawk.dbc')
+        db = cantools.db.load_file(filename)
+        decoded = db.decode_message('ExampleMessage',
+                                    b'\xc0\x06\xe0\x00\x00\x00\x00\x00',
+                                    signals=['Enable', 'Temperature'])
+        self.assertEqual(decoded, {'Temperature': 250.55, 'Enable': 'Enabled'})
+
     def test_multiplex_choices(self):
         filename = os.path.join('tests', 'files', 'multiplex_choices.dbc')
         db = cantools.db.load_file(filename)
@@ -1235,6 +1938,137 @@ class CanToolsTest(unittest.TestCase):
             decoded = message.decode(encoded)
             self.assertEqual(decoded, decoded_message)
 
+    def test_dbc_parser_tokens(self):
+        """The hand-written DBC parser and the pyparsing grammar must
+        create identical tokens.
+
+        """
+
+        filenames = [
+            'emc32.dbc',
+            'foobar.dbc',
+            'motohawk.dbc',
+            'multiplex.dbc',
+            'multiplex_choices.dbc',
+            'padding_bit_order.dbc',
+            'socialledge.dbc',
+            'timing.dbc',
+            'vehicle.dbc'
+        ]
+        grammar = cantools.db.formats.dbc._create_grammar()
+
+        for filename in filenames:
+            with open(os.path.join('tests', 'files', filename)) as fin:
+                string = fin.read()
+
+            self.assertEqual(cantools.db.formats.dbc._Parser(string).parse(),
+                             grammar.parseString(string).asList())
+
+    def test_dbc_load_chunks(self):
+        """Load DBC files in small chunks.
+
+        """
+
+        chunk_size = cantools.db.formats.dbc._CHUNK_SIZE
+        cantools.db.formats.dbc._CHUNK_SIZE = 17
+
+        try:
+            for filename in ['motohawk.dbc', 'vehicle.dbc']:
+                filename = os.path.join('tests', 'files', filename)
+
+                with open(filename) as fin:
+                    db = cantools.db.load(fin)
+
+                with open(filename) as fin:
+                    expected = cantools.db.load_string(fin.read())
+
+                self.assertEqual(db.as_dbc_string(), expected.as_dbc_string())
+
+            # A comment with a line that looks like a message.
+            db = cantools.db.load(StringIO('VERSION ""\n'
+                                           'BO_ 1 M: 8 A\n'
+                                           'CM_ BO_ 1 "Foo\n'
+                                           'BO_ 2 N: 8 A\n'
+                                           'Bar";\n'))
+            self.assertEqual(len(db.messages), 1)
+            self.assertEqual(db.messages[0].comment, 'Foo\nBO_ 2 N: 8 A\nBar')
+
+            # Same error message as when loading from a string.
+            with self.assertRaises(cantools.db.UnsupportedDatabaseFormatError) as cm:
+                cantools.db.load(StringIO('VERSION "1.0"\n'
+                                          'BO_ 546 EMV_Stati 8 A\n'))
+
+            self.assertEqual(
+                str(cm.exception),
+                "DBC: \"Invalid DBC syntax at line 2, column 19: 'BO_ 546 "
+                "EMV_Stati >!<8 A': Expected \":\".\", KCD: \"syntax error: "
+                "line 1, column 0\", SYM: \"Only SYM version 6.0 is "
+                "supported.\"")
+        finally:
+            cantools.db.formats.dbc._CHUNK_SIZE = chunk_size
+
+    def test_dbc_load_lazy(self):
+        filename = 'tests/files/vehicle.dbc'
+        db = cantools.db.load_file(filename)
+        db_lazy = cantools.db.load_file(filename, lazy=True)
+
+        # Messages are parsed on first lookup.
+        message = db_lazy.get_message_by_frame_id(0x9588322)
+        self.assertEqual(message.name, 'RT_SB_INS_Vel_Body_Axes')
+        self.assertIs(db_lazy.get_message_by_name(message.name), message)
+        self.assertEqual(repr(message),
+                         repr(db.get_message_by_frame_id(0x9588322)))
+
+        encoded = db.encode_message(0x9588322, {
+            'Validity_INS_Vel_Forwards': 1,
+            'Validity_INS_Vel_Sideways': 0,
+            'Accuracy_INS_Vel_Body': 71,
+            'INS_Vel_Forwards_2D': 9.5,
+            'INS_Vel_Sideways_2D': -14.2
+        })
+        self.assertEqual(db_lazy.decode_message(0x9588322, encoded),
+                         db.decode_message(0x9588322, encoded))
+
+        with self.assertRaises(KeyError):
+            db_lazy.get_message_by_frame_id(0x7ff)
+
+        # Listing all messages parses the rest.
+        self.assertEqual(repr(db_lazy), repr(db))
+        self.assertEqual(db_lazy.as_dbc_string(), db.as_dbc_string())
+
+    def test_load_files(self):
+        filenames = [
+            'tests/files/foobar.dbc',
+            'tests/files/the_homer.kcd',
+            'tests/files/jopp-6.0.sym',
+            'tests/files/motohawk.dbc',
+            'tests/files/motohawk.dbc'
+        ]
+
+        for jobs in [1, 2]:
+            databases = cantools.db.load_files(filenames,
+                                               jobs=jobs,
+                                               merge=False)
+            self.assertEqual([repr(database) for database in databases],
+                             [repr(cantools.db.load_file(filename))
+                              for filename in filenames])
+
+            db = cantools.db.load_files(filenames, jobs=jobs)
+            self.assertEqual(len(db.messages), 38)
+            self.assertEqual(db.version, '2.0')
+            self.assertEqual(len(db.nodes), 22)
+            self.assertEqual(db.nodes[-1].name, 'PCM1')
+
+            # Later files win frame id and name conflicts.
+            self.assertIs(db.get_message_by_frame_id(0x1f0), db.messages[-1])
+            self.assertIs(db.get_message_by_name('ExampleMessage'),
+                          db.messages[-1])
+
+        with self.assertRaises(cantools.db.UnsupportedDatabaseFormatError):
+            cantools.db.load_files(['tests/files/foobar.dbc',
+                                    'tests/files/jopp-5.0.sym'],
+                                   jobs=2)
+
     def test_dbc_parse_error_messages(self):
         # No valid entry.
         with self.assertRaises(cantools.db.ParseError) as cm:
@@ -1369,6 +2203,92 @@ class CanToolsTest(unittest.TestCase):
             "expected database format 'dbc', 'kcd', 'sym' or None, but "
             "got 'bad'")
 
+    def test_sniff_database_format(self):
+        for filename, database_format in [('foobar.dbc', 'dbc'),
+                                          ('the_homer.kcd', 'kcd'),
+                                          ('empty.kcd', 'kcd'),
+                                          ('jopp-6.0.sym', 'sym')]:
+            with open(os.path.join('tests', 'files', filename)) as fin:
+                string = fin.read()
+
+            self.assertEqual(cantools.db._sniff_format(string),
+                             database_format)
+
+        self.assertEqual(cantools.db._sniff_format(' \nBO_ 1 A: 8 B'), 'dbc')
+        self.assertEqual(cantools.db._sniff_format('BO_TX_BU_ 1 : A;'), None)
+        self.assertEqual(cantools.db._sniff_format(''), None)
+
+        # All formats are tried and reported in the same order if the
+        # sniffed format fails.
+        with self.assertRaises(cantools.db.UnsupportedDatabaseFormatError) as cm:
+            cantools.db.load_string('<Foo')
+
+        self.assertEqual(
+            str(cm.exception),
+            "DBC: \"Invalid DBC syntax at line 1, column 1: '>!<<Foo': "
+            "Expected {VERSION | NS_ | BS_ | BU_ | BO_ | CM_ | BA_DEF_ | "
+            "BA_DEF_DEF_ | BA_ | VAL_ | VAL_TABLE_ | SIG_VALTYPE_ | SG_MUL_VAL_ "
+            "| BO_TX_BU_ | BA_DEF_REL_ | BA_DEF_DEF_REL_ | BA_REL_ | EV_}.\", "
+            "KCD: \"unclosed token: line 1, column 0\", "
+            "SYM: \"Only SYM version 6.0 is supported.\"")
+
+        # A SYM file is loaded from a file object without DBC parsing.
+        with open(os.path.join('tests', 'files', 'jopp-6.0.sym')) as fin:
+            db = cantools.db.load(fin)
+
+        self.assertEqual(db.version, '6.0')
+
+    def test_load_file_cache(self):
+        filename = os.path.join('tests', 'files', 'foobar.dbc')
+        cache_dir = tempfile.mkdtemp()
+
+        try:
+            # The file is only read once when not cached.
+            with patch('cantools.db.open',
+                       create=True,
+                       side_effect=open) as mock_open:
+                db = cantools.db.load_file(filename, cache_dir=cache_dir)
+                opened = [call[0][0] for call in mock_open.call_args_list]
+                self.assertEqual(opened.count(filename), 1)
+
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            self.assertEqual(db.as_dbc_string(),
+                             cantools.db.load_file(filename).as_dbc_string())
+
+            # The second load must not parse the file.
+            with patch('cantools.db.formats.dbc.load_string') as load_string:
+                cached_db = cantools.db.load_file(filename,
+                                                  cache_dir=cache_dir)
+                self.assertEqual(load_string.call_count, 0)
+
+            self.assertEqual(repr(cached_db), repr(db))
+            self.assertEqual(cached_db.as_dbc_string(), db.as_dbc_string())
+            self.assertEqual(
+                cached_db.decode_message('Fum', b'\x09\x50\x00\x00\x00'),
+                {'Fum': 9, 'Fam': 5})
+
+            # The database format is part of the key.
+            cantools.db.load_file(filename,
+                                  database_format='dbc',
+                                  cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+            # Corrupt cache files are ignored.
+            for name in os.listdir(cache_dir):
+                with open(os.path.join(cache_dir, name), 'wb') as fout:
+                    fout.write(b'corrupt')
+
+            cached_db = cantools.db.load_file(filename, cache_dir=cache_dir)
+            self.assertEqual(repr(cached_db), repr(db))
+
+            # The cache directory may be given in the environment.
+            with patch.dict('os.environ', {'CANTOOLS_CACHE_DIR': cache_dir}):
+                with patch('cantools.db.formats.dbc.load_string') as load_string:
+                    cantools.db.load_file(filename)
+                    self.assertEqual(load_string.call_count, 0)
+        finally:
+            shutil.rmtree(cache_dir)
+
     def test_performance_big_endian_signals(self):
         """Test encode/decode performance of a frame with big endian signals.
 
@@ -1416,6 +2336,127 @@ class CanToolsTest(unittest.TestCase):
 
         print("Decode time: {} s ({} s/decode)".format(time, time / iterations))
 
+    def test_performance_sym_grammar(self):
+        """Test SYM load performance with a shared grammar compared to
+        creating the grammar for each load.
+
+        """
+
+        iterations = 20
+
+        with open(os.path.join('tests', 'files', 'jopp-6.0.sym')) as fin:
+            string = fin.read()
+
+        def load_shared():
+            cantools.db.formats.sym.load_string(string)
+
+        def load_created():
+            cantools.db.formats.sym._create_grammar_6_0().parseString(string)
+
+        self.assertIs(cantools.db.formats.sym._get_grammar_6_0(),
+                      cantools.db.formats.sym._get_grammar_6_0())
+
+        time_shared = timeit.timeit(load_shared, number=iterations)
+        time_created = timeit.timeit(load_created, number=iterations)
+
+        print()
+        print("Shared grammar load time: {} s ({} s/load)".format(
+            time_shared,
+            time_shared / iterations))
+        print("Created grammar parse time: {} s ({} s/parse)".format(
+            time_created,
+            time_created / iterations))
+
+    def test_encode_rounding(self):
+        """Scaled values are rounded to the nearest raw value, with ties
+        to even.
+
+        """
+
+        signals = [
+            cantools.db.Signal('A', 0, 8, scale=2),
+            cantools.db.Signal('B', 8, 8, scale=0.1),
+            cantools.db.Signal('C', 16, 8, is_signed=True, scale=0.5, offset=1)
+        ]
+
+        message = cantools.db.Message(frame_id=1,
+                                      name='M0',
+                                      length=3,
+                                      signals=signals)
+
+        self.assertEqual(message.encode({'A': 3, 'B': 0.3, 'C': -2.25}),
+                         b'\x02\x03\xfa')
+        self.assertEqual(message.encode({'A': 5, 'B': 0.25, 'C': -1.75}),
+                         b'\x02\x02\xfa')
+        self.assertEqual(message.encode({'A': 7.9, 'B': 25.5, 'C': 64.5}),
+                         b'\x04\xff\x7f')
+
+    def test_encode_out_of_range(self):
+        """Raw values that do not fit in their signal are an error.
+
+        """
+
+        signals = [
+            cantools.db.Signal('A', 0, 8),
+            cantools.db.Signal('B', 8, 8, is_signed=True)
+        ]
+
+        message = cantools.db.Message(frame_id=1,
+                                      name='M0',
+                                      length=2,
+                                      signals=signals)
+
+        self.assertEqual(message.encode({'A': 255, 'B': -128}), b'\xff\x80')
+        self.assertEqual(message.encode({'A': 0, 'B': 127}), b'\x00\x7f')
+
+        with self.assertRaises(ValueError) as cm:
+            message.encode({'A': 300, 'B': 0})
+
+        self.assertEqual(str(cm.exception),
+                         '"u8" requires 0 <= integer <= 255 (got 300)')
+
+        with self.assertRaises(ValueError) as cm:
+            message.encode({'A': -1, 'B': 0})
+
+        self.assertEqual(str(cm.exception),
+                         '"u8" requires 0 <= integer <= 255 (got -1)')
+
+        with self.assertRaises(ValueError) as cm:
+            message.encode({'A': 0, 'B': -200})
+
+        self.assertEqual(str(cm.exception),
+                         '"s8" requires -128 <= integer <= 127 (got -200)')
+
+        with self.assertRaises(ValueError) as cm:
+            message.encode({'A': 0, 'B': 128})
+
+        self.assertEqual(str(cm.exception),
+                         '"s8" requires -128 <= integer <= 127 (got 128)')
+
+    def test_decode_short_data(self):
+        """Decoding data shorter than the message length is an error.
+
+        """
+
+        filename = os.path.join('tests', 'files', 'motohawk.dbc')
+        db = cantools.db.load_file(filename)
+
+        with self.assertRaises(ValueError) as cm:
+            db.decode_message('ExampleMessage', b'\xc0\x06\xe0')
+
+        self.assertEqual(str(cm.exception),
+                         'unpack requires at least 64 bits to unpack (got 24)')
+
+        # Trailing data is ignored.
+        decoded = db.decode_message('ExampleMessage',
+                                    b'\xc0\x06\xe0\x00\x00\x00\x00\x00\xff')
+        self.assertEqual(decoded,
+                         {
+                             'Temperature': 250.55,
+                             'AverageRadius': 3.2,
+                             'Enable': 'Enabled'
+                         })
+
     def test_padding_one(self):
         """Test to encode a message with padding as one.
 